@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('EventApp', '0004_remove_organizerevent_event_name_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='participation',
+            index=models.Index(condition=models.Q(('selected_event__isnull', True)), fields=['-id'], name='participation_pending_idx'),
+        ),
+    ]
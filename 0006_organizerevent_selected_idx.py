@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('EventApp', '0005_participation_pending_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='organizerevent',
+            index=models.Index(fields=['-selected_at'], name='organizerevent_selected_idx'),
+        ),
+    ]
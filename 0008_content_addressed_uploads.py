@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:40
+
+import EventApp.uploads
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('EventApp', '0007_loginhistory_login_time_default'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='organizerevent',
+            name='file',
+            field=models.FileField(blank=True, null=True, storage=EventApp.uploads.ContentAddressedStorage(), upload_to='organizer_files/'),
+        ),
+        migrations.AlterField(
+            model_name='participation',
+            name='file',
+            field=models.FileField(blank=True, null=True, storage=EventApp.uploads.ContentAddressedStorage(), upload_to='participation_files/'),
+        ),
+    ]
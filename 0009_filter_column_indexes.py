@@ -0,0 +1,41 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('EventApp', '0008_content_addressed_uploads'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='loginhistory',
+            index=models.Index(fields=['login_time'], name='loginhistory_time_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='organizerevent',
+            index=models.Index(fields=['category', 'preferred_date'], name='orgevent_cat_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='organizerevent',
+            index=models.Index(fields=['preferred_date'], name='orgevent_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='organizerevent',
+            index=models.Index(fields=['organizer_email', '-selected_at'], name='orgevent_organizer_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='participation',
+            index=models.Index(fields=['category', 'preferred_date'], name='participation_cat_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='participation',
+            index=models.Index(fields=['preferred_date'], name='participation_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='useraccount',
+            index=models.Index(fields=['role'], name='useraccount_role_idx'),
+        ),
+    ]
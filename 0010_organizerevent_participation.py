@@ -0,0 +1,112 @@
+from decimal import Decimal, InvalidOperation
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def link_events(apps, schema_editor):
+    """
+    Point every OrganizerEvent at its Participation and organizer account.
+
+    Events are matched to a Participation by participant email and idea title
+    (preferring rows already marked selected).  Events whose submission no longer
+    exists, or whose matching submissions are all taken by earlier events, get a
+    Participation rebuilt from the copied columns, so every event is kept.  A
+    matched submission still pending is marked selected, as selecting it would
+    have, so it leaves the organizer queue.
+    Organizer emails with no UserAccount are kept in legacy_organizer_email.
+    """
+    OrganizerEvent = apps.get_model('EventApp', 'OrganizerEvent')
+    Participation = apps.get_model('EventApp', 'Participation')
+    UserAccount = apps.get_model('EventApp', 'UserAccount')
+
+    organizers = {email.lower(): pk for pk, email in UserAccount.objects.values_list('id', 'email')}
+    linked = set()
+
+    for event in OrganizerEvent.objects.order_by('selected_at', 'id').iterator():
+        candidates = (
+            Participation.objects
+            .filter(email__iexact=event.participant_email, idea_title=event.idea_title)
+            .order_by(models.F('selected_event').asc(nulls_last=True), 'id')
+            .values_list('id', flat=True)
+        )
+        participation_id = next((pk for pk in candidates if pk not in linked), None)
+
+        if participation_id is None:
+            budget = event.budget_estimate
+            participation_id = Participation.objects.create(
+                name=event.participant_name,
+                email=event.participant_email,
+                idea_title=event.idea_title,
+                description='',
+                category=event.category,
+                budget_estimate=str(int(budget)) if budget == int(budget) else str(budget),
+                preferred_date=event.preferred_date,
+                location=event.location,
+                venue=event.venue,
+                file=event.file,
+                selected_event=event.idea_title[:100],
+                date_selected=event.selected_at,
+            ).id
+        else:
+            Participation.objects.filter(pk=participation_id, selected_event__isnull=True).update(
+                selected_event=event.idea_title[:100],
+                date_selected=event.selected_at,
+            )
+
+        linked.add(participation_id)
+        organizer_id = organizers.get(event.organizer_email.lower())
+        OrganizerEvent.objects.filter(pk=event.pk).update(
+            participation_id=participation_id,
+            organizer_id=organizer_id,
+            legacy_organizer_email=None if organizer_id else event.organizer_email,
+        )
+
+
+def unlink_events(apps, schema_editor):
+    # reverse: copy the details back into the columns 0011 removes
+    OrganizerEvent = apps.get_model('EventApp', 'OrganizerEvent')
+    for event in OrganizerEvent.objects.select_related('participation', 'organizer').iterator():
+        p = event.participation
+        event.organizer_email = (
+            event.organizer.email if event.organizer else event.legacy_organizer_email or 'unknown@example.com'
+        )
+        event.participant_name = p.name
+        event.participant_email = p.email
+        event.idea_title = p.idea_title
+        event.category = p.category
+        try:
+            event.budget_estimate = Decimal(p.budget_estimate)
+        except InvalidOperation:
+            event.budget_estimate = 0
+        event.preferred_date = p.preferred_date
+        event.location = p.location
+        event.venue = p.venue
+        event.file = p.file
+        event.save()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('EventApp', '0009_filter_column_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='organizerevent',
+            name='participation',
+            field=models.OneToOneField(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='organizer_event', to='EventApp.participation'),
+        ),
+        migrations.AddField(
+            model_name='organizerevent',
+            name='organizer',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='organized_events', to='EventApp.useraccount'),
+        ),
+        migrations.AddField(
+            model_name='organizerevent',
+            name='legacy_organizer_email',
+            field=models.EmailField(blank=True, max_length=254, null=True),
+        ),
+        migrations.RunPython(link_events, unlink_events),
+    ]
@@ -0,0 +1,73 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('EventApp', '0010_organizerevent_participation'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='organizerevent',
+            name='participation',
+            field=models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='organizer_event', to='EventApp.participation'),
+        ),
+        migrations.RemoveIndex(
+            model_name='organizerevent',
+            name='orgevent_cat_date_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='organizerevent',
+            name='orgevent_date_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='organizerevent',
+            name='orgevent_organizer_idx',
+        ),
+        migrations.RemoveField(
+            model_name='organizerevent',
+            name='budget_estimate',
+        ),
+        migrations.RemoveField(
+            model_name='organizerevent',
+            name='category',
+        ),
+        migrations.RemoveField(
+            model_name='organizerevent',
+            name='file',
+        ),
+        migrations.RemoveField(
+            model_name='organizerevent',
+            name='idea_title',
+        ),
+        migrations.RemoveField(
+            model_name='organizerevent',
+            name='location',
+        ),
+        migrations.RemoveField(
+            model_name='organizerevent',
+            name='organizer_email',
+        ),
+        migrations.RemoveField(
+            model_name='organizerevent',
+            name='participant_email',
+        ),
+        migrations.RemoveField(
+            model_name='organizerevent',
+            name='participant_name',
+        ),
+        migrations.RemoveField(
+            model_name='organizerevent',
+            name='preferred_date',
+        ),
+        migrations.RemoveField(
+            model_name='organizerevent',
+            name='venue',
+        ),
+        migrations.AddIndex(
+            model_name='organizerevent',
+            index=models.Index(fields=['organizer', '-selected_at'], name='orgevent_organizer_idx'),
+        ),
+    ]
@@ -0,0 +1,66 @@
+import ast
+import json
+import re
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def _parse_items(text):
+    # the text columns were never written by the form; accept JSON / Python
+    # lists as well as comma separated values
+    if not text:
+        return []
+    for parse in (json.loads, ast.literal_eval):
+        try:
+            value = parse(text)
+        except (ValueError, SyntaxError):
+            continue
+        if isinstance(value, (list, tuple)):
+            return [str(item) for item in value]
+    return text.split(',')
+
+
+def move_catering_and_budgets(apps, schema_editor):
+    Participation = apps.get_model('EventApp', 'Participation')
+    CateringSelection = apps.get_model('EventApp', 'CateringSelection')
+
+    selections = []
+    for p in Participation.objects.only('id', 'budget_estimate', 'snack_items', 'fullmeal_items').iterator():
+        items = {
+            item.strip().lower()[:50]
+            for item in _parse_items(p.snack_items) + _parse_items(p.fullmeal_items)
+            if item.strip()
+        }
+        selections.extend(CateringSelection(participation_id=p.id, item=item) for item in items)
+
+        # "5,000" -> "5000", "1200.50" -> "1200", junk -> "0" so 0013 can cast the column
+        digits = re.sub(r'[^\d.]', '', p.budget_estimate or '').split('.')[0]
+        budget = digits or '0'
+        if budget != p.budget_estimate:
+            Participation.objects.filter(pk=p.pk).update(budget_estimate=budget)
+
+    CateringSelection.objects.bulk_create(selections, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('EventApp', '0011_remove_organizerevent_copied_columns'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CateringSelection',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('item', models.CharField(max_length=50)),
+                ('participation', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='catering_selections', to='EventApp.participation')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['item', 'participation'], name='catering_item_idx')],
+                'constraints': [models.UniqueConstraint(fields=('participation', 'item'), name='catering_selection_unique')],
+            },
+        ),
+        migrations.RunPython(move_catering_and_budgets, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,28 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('EventApp', '0012_cateringselection'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='participation',
+            name='fullmeal_items',
+        ),
+        migrations.RemoveField(
+            model_name='participation',
+            name='snack_items',
+        ),
+        migrations.AlterField(
+            model_name='participation',
+            name='budget_estimate',
+            field=models.PositiveIntegerField(),
+        ),
+        migrations.AddIndex(
+            model_name='participation',
+            index=models.Index(fields=['budget_estimate'], name='participation_budget_idx'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:53
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('EventApp', '0013_participation_budget_integer'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LoginDailySummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('email', models.EmailField(max_length=254)),
+                ('day', models.DateField()),
+                ('login_count', models.PositiveIntegerField(default=0)),
+                ('first_login', models.DateTimeField()),
+                ('last_login', models.DateTimeField()),
+                ('user', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='EventApp.useraccount')),
+            ],
+            options={
+                'verbose_name_plural': 'login daily summaries',
+                'indexes': [models.Index(fields=['day'], name='logindailysummary_day_idx')],
+                'constraints': [models.UniqueConstraint(fields=('user', 'day'), name='logindailysummary_user_day')],
+            },
+        ),
+    ]
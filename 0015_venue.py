@@ -0,0 +1,52 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:00
+
+from django.db import migrations, models
+
+# the venue lists that used to be hard-coded in forms.py / participate.html
+VENUE_OPTIONS = {
+    "agrabad": ["Classic world convention Hall", "Hotel Agrabad", "Abdullah convention Hall", "VIP Banquet", 
+                "The Green Shadow Rasturant", "The village Rasturant", "Bir Bangali Rasturant", "Hotel Rahman & Rasturant"],
+    "bohoddarhat": ["Ahad Convention Hall", "AK convention Hall", "RB convention Hall", "Hall-7 Convention center", 
+                "Din Mohammad Convention Hall", "Handi Rasturant", "Barcode Food Junction", "Hotel Zaman & Rasturant"],
+    "chawkbazar": ["Al-Razzaque Convention Hall", "New Shapla Banquet Hall", "City View Banquet Hall", "Blue Ocean Banquet Hall", 
+            "The Food Court Rasturant", "The Tasty Treat Rasturant", "Spicy Villa Rasturant", "Hotel Sea Crown & Rasturant"],
+    "gec": ["K & K Convention Hall", "Royal Garden Banquet Hall", "Grand Plaza Banquet Hall", "Sky View Banquet Hall", 
+            "The Royal Feast Rasturant", "The Grand Treat Rasturant", "Spicey Treat Rasturant", "Hotel Alif & Rasturant"],
+    "jamal_khan": ["JK Convention Hall", "City Heart Banquet Hall", "Sunset Banquet Hall", "Dawaat Rasturant", 
+            "Royal Feast Rasturant", "Tasty Treat Rasturant", "Food Villa Rasturant", "Hotel Imperial & Rasturant"],
+    "new_market": ["Elite Banquet Hall", "Majestic Banquet Hall", "Food Court Rasturant", 
+            "The Royal Dine Rasturant", "Yummy Treat Rasturant", "Gourmet Villa Rasturant", "Hotel Crown & Rasturant"],
+}
+
+
+def seed_venues(apps, schema_editor):
+    Venue = apps.get_model('EventApp', 'Venue')
+    Venue.objects.bulk_create([
+        Venue(location=location, name=name)
+        for location, names in VENUE_OPTIONS.items()
+        for name in names
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('EventApp', '0014_logindailysummary'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Venue',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('location', models.CharField(choices=[('agrabad', 'Agrabad'), ('bohoddarhat', 'Bohoddarhat'), ('chawkbazar', 'Chawkbazar'), ('gec', 'GEC'), ('jamal_khan', 'Jamal Khan'), ('new_market', 'New Market')], max_length=100)),
+                ('name', models.CharField(max_length=100)),
+                ('capacity', models.PositiveIntegerField(blank=True, help_text='Guests', null=True)),
+                ('is_active', models.BooleanField(default=True)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('location', 'name'), name='venue_location_name_unique')],
+            },
+        ),
+        migrations.RunPython(seed_venues, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:02
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def book_selected_venues(apps, schema_editor):
+    # earlier selections keep their venue/date; later double bookings stay
+    # selected but unbooked
+    OrganizerEvent = apps.get_model('EventApp', 'OrganizerEvent')
+    VenueBooking = apps.get_model('EventApp', 'VenueBooking')
+    taken = set()
+    bookings = []
+    events = (OrganizerEvent.objects.order_by('selected_at', 'id')
+              .values_list('participation_id', 'participation__location',
+                           'participation__venue', 'participation__preferred_date'))
+    for participation_id, location, venue, date in events.iterator():
+        if not venue or date is None or (location, venue, date) in taken:
+            continue
+        taken.add((location, venue, date))
+        bookings.append(VenueBooking(participation_id=participation_id, location=location, venue=venue, date=date))
+    VenueBooking.objects.bulk_create(bookings, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('EventApp', '0015_venue'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VenueBooking',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('location', models.CharField(max_length=100)),
+                ('venue', models.CharField(max_length=100)),
+                ('date', models.DateField()),
+                ('participation', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='venue_booking', to='EventApp.participation')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('location', 'venue', 'date'), name='venue_booking_unique')],
+            },
+        ),
+        migrations.RunPython(book_selected_venues, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,74 @@
+from django.db import migrations
+
+# Kept in sync by triggers, so bulk_create/update() are covered too.  Note
+# that the SQLite schema editor rebuilds a table for many ALTERs (dropping its
+# triggers): a later migration that does so to EventApp_participation must
+# run SQLITE_FORWARD again.
+SQLITE_FORWARD = [
+    """
+    CREATE VIRTUAL TABLE participation_fts USING fts5(
+        idea_title, description,
+        content='EventApp_participation', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER participation_fts_insert AFTER INSERT ON "EventApp_participation" BEGIN
+        INSERT INTO participation_fts(rowid, idea_title, description)
+        VALUES (new.id, new.idea_title, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER participation_fts_delete AFTER DELETE ON "EventApp_participation" BEGIN
+        INSERT INTO participation_fts(participation_fts, rowid, idea_title, description)
+        VALUES ('delete', old.id, old.idea_title, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER participation_fts_update AFTER UPDATE OF idea_title, description
+    ON "EventApp_participation" BEGIN
+        INSERT INTO participation_fts(participation_fts, rowid, idea_title, description)
+        VALUES ('delete', old.id, old.idea_title, old.description);
+        INSERT INTO participation_fts(rowid, idea_title, description)
+        VALUES (new.id, new.idea_title, new.description);
+    END
+    """,
+    "INSERT INTO participation_fts(participation_fts) VALUES ('rebuild')",
+]
+SQLITE_REVERSE = [
+    "DROP TRIGGER IF EXISTS participation_fts_insert",
+    "DROP TRIGGER IF EXISTS participation_fts_delete",
+    "DROP TRIGGER IF EXISTS participation_fts_update",
+    "DROP TABLE IF EXISTS participation_fts",
+]
+
+# same expression as search.PG_DOCUMENT, so the planner can use the index
+POSTGRESQL_FORWARD = [
+    """
+    CREATE INDEX participation_search_idx ON "EventApp_participation" USING gin (
+        to_tsvector('simple', coalesce(idea_title, '') || ' ' || coalesce(description, ''))
+    )
+    """,
+]
+POSTGRESQL_REVERSE = ["DROP INDEX IF EXISTS participation_search_idx"]
+
+
+def _run(statements_by_vendor):
+    def run(apps, schema_editor):
+        for statement in statements_by_vendor.get(schema_editor.connection.vendor, []):
+            schema_editor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('EventApp', '0016_venuebooking'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            _run({'sqlite': SQLITE_FORWARD, 'postgresql': POSTGRESQL_FORWARD}),
+            _run({'sqlite': SQLITE_REVERSE, 'postgresql': POSTGRESQL_REVERSE}),
+        ),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:28
+
+from collections import Counter
+
+from django.db import migrations, models
+
+# facets.BUDGET_BANDS as of this migration: (key, low, high)
+BUDGET_BANDS = [
+    ('under_10k', 0, 10_000),
+    ('10k_50k', 10_000, 50_000),
+    ('50k_100k', 50_000, 100_000),
+    ('100k_500k', 100_000, 500_000),
+    ('500k_plus', 500_000, None),
+]
+
+
+def count_pending(apps, schema_editor):
+    Participation = apps.get_model('EventApp', 'Participation')
+    FacetCount = apps.get_model('EventApp', 'FacetCount')
+    counts = Counter()
+    pending = (Participation.objects.filter(selected_event__isnull=True)
+               .values_list('category', 'location', 'catering_type', 'budget_estimate'))
+    for category, location, catering_type, budget in pending.iterator():
+        band = next(key for key, low, high in reversed(BUDGET_BANDS) if budget >= low)
+        counts.update([('category', category), ('location', location),
+                       ('catering', catering_type or 'none'), ('budget', band)])
+    FacetCount.objects.bulk_create([
+        FacetCount(facet=facet, value=value, count=count) for (facet, value), count in counts.items()
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('EventApp', '0017_participation_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FacetCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('facet', models.CharField(max_length=20)),
+                ('value', models.CharField(max_length=100)),
+                ('count', models.IntegerField(default=0)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('facet', 'value'), name='facetcount_facet_value')],
+            },
+        ),
+        migrations.RunPython(count_pending, migrations.RunPython.noop),
+    ]
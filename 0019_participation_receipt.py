@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('EventApp', '0018_facetcount'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='participation',
+            name='receipt',
+            field=models.CharField(blank=True, editable=False, max_length=32, null=True),
+        ),
+        migrations.AddConstraint(
+            model_name='participation',
+            constraint=models.UniqueConstraint(condition=models.Q(('receipt__isnull', False)), fields=('receipt',), name='participation_receipt_unique'),
+        ),
+    ]
@@ -0,0 +1,25 @@
+from django.db import migrations
+
+
+def analyze(apps, schema_editor):
+    # SQLite keeps no table statistics until ANALYZE runs; the admin's
+    # EstimatedCountPaginator reads them (prune_login_history refreshes them
+    # daily).  Statistics taken of an empty database would only mislead the
+    # planner, so a fresh install waits for the first prune.
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    models = ('Participation', 'OrganizerEvent', 'LoginHistory', 'LoginDailySummary')
+    if any(apps.get_model('EventApp', name).objects.exists() for name in models):
+        schema_editor.execute('PRAGMA analysis_limit = 1000')
+        schema_editor.execute('ANALYZE')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('EventApp', '0019_participation_receipt'),
+    ]
+
+    operations = [
+        migrations.RunPython(analyze, migrations.RunPython.noop),
+    ]
@@ -1,27 +1,194 @@
+import csv
+
 from django.contrib import admin
-from .models import Participation, OrganizerEvent, UserAccount,LoginHistory
+from django.contrib.admin.options import IncorrectLookupParameters
+from django.core.exceptions import PermissionDenied
+from django.core.paginator import Paginator
+from django.db import connections, router
+from django.http import HttpResponseRedirect, StreamingHttpResponse
+from django.urls import path
+from django.utils import timezone
+from django.utils.functional import cached_property
+
+from .models import Participation, OrganizerEvent, UserAccount,LoginHistory, LoginDailySummary, Venue, VenueBooking
+from . import facets, search
+from .middleware import invalidate_account
+from .venues import invalidate_venue_catalog
+
+
+def estimate_row_count(model):
+    """
+    Row count of ``model``'s table from the planner statistics, or None.
+
+    PostgreSQL keeps pg_class.reltuples current through autovacuum; SQLite only
+    has sqlite_stat1 once ANALYZE (or PRAGMA optimize) has run.
+    """
+    table = model._meta.db_table
+    connection = connections[router.db_for_read(model)]
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute("SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(%s)", [table])
+        elif connection.vendor == 'mysql':
+            cursor.execute(
+                "SELECT table_rows FROM information_schema.tables "
+                "WHERE table_schema = DATABASE() AND table_name = %s", [table])
+        elif connection.vendor == 'sqlite':
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sqlite_stat1'")
+            if cursor.fetchone() is None:
+                return None
+            # the first number of each stat is the row count of the table / (partial) index
+            cursor.execute("SELECT stat FROM sqlite_stat1 WHERE tbl = %s", [table])
+            counts = [int(stat.split()[0]) for stat, in cursor.fetchall()]
+            return max(counts) if counts else None
+        else:
+            return None
+        row = cursor.fetchone()
+    return int(row[0]) if row and row[0] is not None and row[0] >= 0 else None
+
+
+def refresh_row_estimates(using='default'):
+    """
+    Refresh the SQLite statistics estimate_row_count() reads.  Run by migration
+    0020 and by the daily prune_login_history; PostgreSQL's autovacuum keeps
+    its own current.
+    """
+    connection = connections[using]
+    if connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            # sample at most ~1000 rows per index: approximate counts, fast on big tables
+            cursor.execute('PRAGMA analysis_limit = 1000')
+            cursor.execute('ANALYZE')
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Uses the table statistics instead of COUNT(*) for an unfiltered changelist
+    on a large table.  Filtered lists and small tables get the exact count.
+
+    On SQLite the statistics only exist after ANALYZE: without them (or for a
+    table that has grown past them) this quietly counts exactly, so keep
+    prune_login_history running daily; it calls refresh_row_estimates().
+    """
+    exact_below = 10_000
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if not queryset.query.where:
+            estimate = estimate_row_count(queryset.model)
+            if estimate is not None and estimate >= self.exact_below:
+                return estimate
+        return super().count
+
+
+class _Echo:
+    # csv.writer target that hands each formatted line straight back
+    def write(self, value):
+        return value
+
+
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+
+def spreadsheet_safe(row):
+    """``row`` with text cells that a spreadsheet would run as a formula quoted with a leading '."""
+    # names, titles and emails are typed by participants
+    return [f"'{value}" if isinstance(value, str) and value.startswith(FORMULA_PREFIXES) else value
+            for value in row]
+
+
+class CsvExportMixin:
+    """
+    Streams a changelist to CSV without loading it into memory.
+
+    The "Export CSV" button (admin_export_change_list.html) carries the current
+    filters and search to ``<changelist>/export/``, which rebuilds the
+    ChangeList and streams ``values_list(*csv_fields)`` in chunks.  The
+    "Export selected" action does the same for the ticked rows.
+    """
+    change_list_template = 'admin_export_change_list.html'
+    csv_fields = ()  # field names / lookups, also used as the header row
+    csv_chunk_size = 2000
+    actions = ('export_selected_csv',)
+
+    def get_urls(self):
+        opts = self.model._meta
+        return [
+            path(
+                'export/',
+                self.admin_site.admin_view(self.export_csv_view),
+                name=f'{opts.app_label}_{opts.model_name}_export',
+            ),
+        ] + super().get_urls()
+
+    def export_csv_view(self, request):
+        if not self.has_view_permission(request):
+            raise PermissionDenied
+        try:
+            cl = self.get_changelist_instance(request)
+        except IncorrectLookupParameters:
+            return HttpResponseRedirect('../?e=1')
+        return self.stream_csv(cl.queryset)
+
+    @admin.action(description="Export selected rows as CSV", permissions=['view'])
+    def export_selected_csv(self, request, queryset):
+        return self.stream_csv(queryset)
+
+    def stream_csv(self, queryset):
+        rows = queryset.values_list(*self.csv_fields).iterator(chunk_size=self.csv_chunk_size)
+        writer = csv.writer(_Echo())
+
+        def lines():
+            yield writer.writerow(self.csv_fields)
+            for row in rows:
+                yield writer.writerow(spreadsheet_safe(row))
+
+        filename = f"{self.model._meta.model_name}-{timezone.now():%Y%m%d-%H%M%S}.csv"
+        response = StreamingHttpResponse(lines(), content_type='text/csv')
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+
 
 # ---------------- OrganizerEvent Admin ----------------
 @admin.register(OrganizerEvent)
-class OrganizerEventAdmin(admin.ModelAdmin):
+class OrganizerEventAdmin(CsvExportMixin, admin.ModelAdmin):
     list_display = (
-        'participant_name',
-        'participant_email',
-        'category',
-        'idea_title',
-        'budget_estimate',
-        'preferred_date',
-        'location',
-        'venue',
-        'organizer_email',  # Correct field name
+        'participation__name',
+        'participation__email',
+        'participation__category',
+        'participation__idea_title',
+        'participation__budget_estimate',
+        'participation__preferred_date',
+        'participation__location',
+        'participation__venue',
+        'organizer',
         'selected_at'
     )
     list_filter = (
-        'category',
-        'preferred_date',
-        'organizer_email',  # Correct field name
+        'participation__category',
+        'participation__preferred_date',
+        ('organizer', admin.RelatedOnlyFieldListFilter),
+    )
+    search_fields = ('participation__name', 'participation__idea_title', 'organizer__email', 'legacy_organizer_email')
+    list_select_related = ('participation', 'organizer')
+    raw_id_fields = ('participation', 'organizer')
+    date_hierarchy = 'selected_at'
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    csv_fields = (
+        'id',
+        'selected_at',
+        'organizer__email',
+        'participation_id',
+        'participation__name',
+        'participation__email',
+        'participation__idea_title',
+        'participation__category',
+        'participation__budget_estimate',
+        'participation__preferred_date',
+        'participation__location',
+        'participation__venue',
     )
-    search_fields = ('participant_name', 'idea_title', 'organizer_email')
 
 # ❌ Remove this line: admin.site.register(OrganizerEvent, OrganizerEventAdmin)
 
@@ -42,6 +209,20 @@ class UserAccountAdmin(admin.ModelAdmin):
             if old_obj.password != obj.password:
                 obj.set_password(obj.password)
         super().save_model(request, obj, form, change)
+        # drop the identity cached in this user's sessions (role/email may have changed)
+        invalidate_account(obj.pk)
+
+    def delete_model(self, request, obj):
+        user_id = obj.pk
+        super().delete_model(request, obj)
+        invalidate_account(user_id)
+
+    def delete_queryset(self, request, queryset):
+        # "delete selected" action
+        user_ids = list(queryset.values_list('pk', flat=True))
+        super().delete_queryset(request, queryset)
+        for user_id in user_ids:
+            invalidate_account(user_id)
 
 # LoginHistory admin
 @admin.register(LoginHistory)
@@ -49,15 +230,118 @@ class LoginHistoryAdmin(admin.ModelAdmin):
     list_display = ('email', 'user', 'login_time', 'get_hashed_password')
     search_fields = ('email', 'user__email')
     list_filter = ('login_time',)
+    list_select_related = ('user',)  # get_hashed_password reads obj.user
+    date_hierarchy = 'login_time'
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
     def get_hashed_password(self, obj):
         return obj.user.password  # hashed password show korbe
     get_hashed_password.short_description = "Hashed Password"
 
 
+# Rolled-up login counts for days older than LOGIN_HISTORY_RETENTION_DAYS
+@admin.register(LoginDailySummary)
+class LoginDailySummaryAdmin(admin.ModelAdmin):
+    list_display = ('day', 'email', 'login_count', 'first_login', 'last_login')
+    search_fields = ('email',)
+    date_hierarchy = 'day'
+    raw_id_fields = ('user',)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    # written only by prune_login_history
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
 # ---------------- Participation Admin ----------------
 @admin.register(Participation)
-class ParticipationAdmin(admin.ModelAdmin):
+class ParticipationAdmin(CsvExportMixin, admin.ModelAdmin):
     list_display = ('idea_title', 'name', 'email', 'category', 'preferred_date')
-    search_fields = ('idea_title', 'name', 'email', 'category')
+    search_fields = ('name', 'email', 'category')  # LIKE search; titles and descriptions use the index
     list_filter = ('category', 'preferred_date')
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    csv_fields = (
+        'id',
+        'name',
+        'email',
+        'idea_title',
+        'description',
+        'category',
+        'budget_estimate',
+        'preferred_date',
+        'catering_type',
+        'location',
+        'venue',
+        'selected_event',
+        'date_selected',
+    )
+
+    def get_search_results(self, request, queryset, search_term):
+        # idea title/description through the full-text index instead of
+        # LIKE '%term%' scans; the short columns in search_fields as usual
+        queryset_by_fields, may_have_duplicates = super().get_search_results(request, queryset, search_term)
+        if not search_term:
+            return queryset_by_fields, may_have_duplicates
+        return queryset_by_fields | search.matching(queryset, search_term), may_have_duplicates
+
+    # keep the organizer queue's facet counters in step with edits here
+    def save_model(self, request, obj, form, change):
+        before = None
+        if change:
+            before = (Participation.objects.filter(pk=obj.pk, selected_event__isnull=True)
+                      .only(*facets.FACET_COLUMNS).first())
+        super().save_model(request, obj, form, change)
+        if before is not None:
+            facets.count_removed([before])
+        if obj.selected_event is None:
+            facets.count_added([obj])
+
+    def delete_model(self, request, obj):
+        pending = obj.selected_event is None
+        super().delete_model(request, obj)
+        if pending:
+            facets.count_removed([obj])
+
+    def delete_queryset(self, request, queryset):
+        pending = list(queryset.filter(selected_event__isnull=True).only(*facets.FACET_COLUMNS))
+        super().delete_queryset(request, queryset)
+        facets.count_removed(pending)
+
+
+# ---------------- Venue Admin ----------------
+@admin.register(Venue)
+class VenueAdmin(admin.ModelAdmin):
+    list_display = ('name', 'location', 'capacity', 'is_active')
+    list_editable = ('capacity', 'is_active')
+    list_filter = ('location', 'is_active')
+    search_fields = ('name',)
+
+    # the form and /venues/ serve an in-memory copy; make every process reload it
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        invalidate_venue_catalog()
+
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        invalidate_venue_catalog()
+
+    def delete_queryset(self, request, queryset):
+        super().delete_queryset(request, queryset)
+        invalidate_venue_catalog()
+
+
+# VenueBooking admin (rows are created when an organizer selects a submission)
+@admin.register(VenueBooking)
+class VenueBookingAdmin(admin.ModelAdmin):
+    list_display = ('date', 'venue', 'location', 'participation')
+    list_filter = ('location',)
+    search_fields = ('venue',)
+    date_hierarchy = 'date'
+    list_select_related = ('participation',)
+    raw_id_fields = ('participation',)
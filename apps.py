@@ -4,3 +4,14 @@ from django.apps import AppConfig
 class EventappConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'EventApp'
+
+    def ready(self):
+        from django.conf import settings
+
+        from . import checks  # noqa: F401  (registers the system checks)
+
+        if settings.SUBMISSION_WRITE_BEHIND and settings.SUBMISSION_DRAIN_IN_BACKGROUND:
+            from .journal import submission_journal
+
+            # don't leave a crashed run's submissions waiting for the next one
+            submission_journal.start()
@@ -0,0 +1,25 @@
+from django.conf import settings
+from django.core.checks import Tags, Warning, register
+
+PER_PROCESS_CACHES = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+@register(Tags.caches, deploy=True)
+def check_shared_cache(app_configs, **kwargs):
+    # feed pages, the venue catalog and session identities are invalidated
+    # through version keys in these caches; rate-limit buckets live there too
+    errors = []
+    for alias in sorted({'default', settings.RATELIMIT_CACHE}):
+        backend = settings.CACHES[alias]['BACKEND']
+        if backend in PER_PROCESS_CACHES:
+            errors.append(Warning(
+                f"CACHES['{alias}'] uses {backend.rsplit('.', 1)[-1]}, which is private to each process: "
+                "admin edits and selections only invalidate the process that served them, "
+                "and rate limits are counted per process.",
+                hint="Set REDIS_URL, or configure another shared cache backend.",
+                id='EventApp.W001',
+            ))
+    return errors
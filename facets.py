@@ -0,0 +1,172 @@
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import Count, F, Q
+
+from .models import CATEGORY_CHOICES, CATERING_CHOICES, LOCATION_CHOICES, FacetCount, Participation
+
+# (key, label, low, high): budget_estimate in [low, high); high None = no limit
+BUDGET_BANDS = [
+    ('under_10k', 'Under 10,000', 0, 10_000),
+    ('10k_50k', '10,000 – 49,999', 10_000, 50_000),
+    ('50k_100k', '50,000 – 99,999', 50_000, 100_000),
+    ('100k_500k', '100,000 – 499,999', 100_000, 500_000),
+    ('500k_plus', '500,000 and above', 500_000, None),
+]
+
+# facet -> (label, value choices); the facet names are also the ?facet=value filters
+FACETS = {
+    'category': ('Category', CATEGORY_CHOICES),
+    'location': ('Location', LOCATION_CHOICES),
+    'catering': ('Catering', CATERING_CHOICES),
+    'budget': ('Budget', [(key, label) for key, label, _, _ in BUDGET_BANDS]),
+}
+
+# only these are read from the rows to count them
+FACET_COLUMNS = ('category', 'location', 'catering_type', 'budget_estimate')
+
+
+def budget_band(amount):
+    for key, _, low, high in BUDGET_BANDS:
+        if amount >= low and (high is None or amount < high):
+            return key
+    return BUDGET_BANDS[0][0]
+
+
+def facet_values(participation):
+    """The (facet, value) pairs ``participation`` is counted under."""
+    return [
+        ('category', participation.category),
+        ('location', participation.location),
+        ('catering', participation.catering_type or 'none'),
+        ('budget', budget_band(participation.budget_estimate)),
+    ]
+
+
+# =====================================================
+# COUNTERS
+# =====================================================
+# FacetCount holds, per facet value, the number of pending (not yet selected)
+# participations.  Submitting adds to the counters and selecting subtracts, a
+# few single-row UPDATEs each, so reading all counts is one small query
+# instead of a GROUP BY per facet over Participation.
+
+def count_added(participations):
+    """Count new pending ``participations`` (call after inserting them)."""
+    _apply(_deltas(participations, 1))
+
+
+def count_removed(participations):
+    """Stop counting ``participations`` (selected, or deleted while pending)."""
+    _apply(_deltas(participations, -1))
+
+
+def _deltas(participations, sign):
+    deltas = Counter()
+    for participation in participations:
+        for key in facet_values(participation):
+            deltas[key] += sign
+    return deltas
+
+
+def _apply(deltas):
+    # sorted, so concurrent writers lock the counter rows in the same order
+    changes = sorted((key, delta) for key, delta in deltas.items() if delta)
+    if not changes:
+        return
+    with transaction.atomic():
+        missing = [
+            (key, delta) for key, delta in changes
+            if not FacetCount.objects.filter(facet=key[0], value=key[1]).update(count=F('count') + delta)
+        ]
+        if missing:
+            # first participation with this value; another writer may create it too
+            FacetCount.objects.bulk_create(
+                [FacetCount(facet=facet, value=value) for (facet, value), _ in missing],
+                ignore_conflicts=True,
+            )
+            for (facet, value), delta in missing:
+                FacetCount.objects.filter(facet=facet, value=value).update(count=F('count') + delta)
+
+
+def rebuild():
+    """Recount every facet from the pending participations; returns the number of counters."""
+    pending = Participation.objects.filter(selected_event__isnull=True)
+    counts = Counter()
+    for facet, column in (('category', 'category'), ('location', 'location'), ('catering', 'catering_type')):
+        for value, count in pending.values_list(column).annotate(n=Count('id')).order_by():
+            counts[facet, value or 'none'] += count
+    for key, _, low, high in BUDGET_BANDS:
+        band = pending.filter(budget_estimate__gte=low)
+        if high is not None:
+            band = band.filter(budget_estimate__lt=high)
+        counts['budget', key] = band.count()
+
+    with transaction.atomic():
+        FacetCount.objects.all().delete()
+        FacetCount.objects.bulk_create([
+            FacetCount(facet=facet, value=value, count=count)
+            for (facet, value), count in counts.items() if count
+        ])
+    return len(counts)
+
+
+# =====================================================
+# READING / FILTERING
+# =====================================================
+def facet_counts(active=None):
+    """
+    Pending counts for the organizer's filter menus, in FACETS order:
+    ``[{'name', 'label', 'values': [{'value', 'label', 'count', 'active'}]}]``.
+
+    Counts are over the whole pending queue, not narrowed by the other
+    active filters; values nobody picked are left out.
+    """
+    return _menus(FacetCount.objects.filter(count__gt=0), active or {})
+
+
+async def afacet_counts(active=None):
+    """facet_counts() for async views."""
+    return _menus([row async for row in FacetCount.objects.filter(count__gt=0)], active or {})
+
+
+def _menus(rows, active):
+    counts = {(row.facet, row.value): row.count for row in rows}
+    menus = []
+    for name, (label, choices) in FACETS.items():
+        values = [
+            {'value': value, 'label': value_label, 'count': counts[name, value],
+             'active': active.get(name) == value}
+            for value, value_label in choices if (name, value) in counts
+        ]
+        menus.append({'name': name, 'label': label, 'values': values})
+    return menus
+
+
+def active_filters(params):
+    """The known facet filters in ``params`` (request.GET), e.g. {'category': 'wedding'}."""
+    return {
+        name: params[name] for name, (_, choices) in FACETS.items()
+        if params.get(name) in dict(choices)
+    }
+
+
+def filter_queue(queryset, active):
+    """Narrow a Participation queryset to the ``active_filters``."""
+    if 'category' in active:
+        queryset = queryset.filter(category=active['category'])
+    if 'location' in active:
+        queryset = queryset.filter(location=active['location'])
+    if 'catering' in active:
+        if active['catering'] == 'none':
+            queryset = queryset.filter(
+                Q(catering_type='none') | Q(catering_type='') | Q(catering_type__isnull=True)
+            )
+        else:
+            queryset = queryset.filter(catering_type=active['catering'])
+    if 'budget' in active:
+        _, _, low, high = next(band for band in BUDGET_BANDS if band[0] == active['budget'])
+        queryset = queryset.filter(budget_estimate__gte=low)
+        if high is not None:
+            queryset = queryset.filter(budget_estimate__lt=high)
+    return queryset
@@ -0,0 +1,99 @@
+import time
+from contextlib import nullcontext
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.template.loader import render_to_string
+
+from .models import OrganizerEvent
+from .routers import use_primary
+
+# Rendered feed pages are cached under a version number in the default cache.
+# Bumping the version (whenever an OrganizerEvent is created) orphans every
+# cached page at once; the stale entries simply expire.  Pages and version must
+# live in a cache every server process shares (REDIS_URL, see CACHES in
+# settings), or other processes keep serving their own stale pages.
+FEED_VERSION_KEY = 'p_event_feed:version'
+FEED_CHANGED_KEY = 'p_event_feed:changed_at'
+FEED_COLUMNS = (
+    'id', 'selected_at', 'participation__idea_title', 'participation__category',
+    'participation__preferred_date', 'participation__location', 'participation__venue',
+)
+
+
+def _feed_version():
+    version = cache.get(FEED_VERSION_KEY)
+    if version is None:
+        # cold or evicted cache: start from a value no earlier page can have used
+        cache.add(FEED_VERSION_KEY, time.time_ns(), timeout=None)
+        version = cache.get(FEED_VERSION_KEY)
+    return version
+
+
+async def _afeed_version():
+    version = await cache.aget(FEED_VERSION_KEY)
+    if version is None:
+        await cache.aadd(FEED_VERSION_KEY, time.time_ns(), timeout=None)
+        version = await cache.aget(FEED_VERSION_KEY)
+    return version
+
+
+def invalidate_event_feed():
+    cache.set(FEED_CHANGED_KEY, time.time(), settings.REPLICA_STICKY_SECONDS)
+    try:
+        cache.incr(FEED_VERSION_KEY)
+    except ValueError:
+        cache.add(FEED_VERSION_KEY, time.time_ns(), timeout=None)
+
+
+def _feed_paginator():
+    events = (
+        OrganizerEvent.objects
+        .select_related('participation')
+        .only(*FEED_COLUMNS)
+        .order_by('-selected_at')
+    )
+    return Paginator(events, settings.EVENT_FEED_PAGE_SIZE)
+
+
+def _render(page_obj):
+    # no request here: the page is shared by every participant, so it must
+    # not contain per-user data (messages, csrf tokens)
+    return render_to_string("P_Event.html", {'page_obj': page_obj, 'events': page_obj})
+
+
+def render_feed_page(page_number):
+    """Return the rendered P_Event.html for feed page ``page_number`` (an int >= 1)."""
+    key = f'p_event_feed:v{_feed_version()}:page:{page_number}'
+    html = cache.get(key)
+    if html is None:
+        # right after a selection the replica may not have it yet; build the
+        # page that gets cached under the new version from the primary
+        fresh = cache.get(FEED_CHANGED_KEY) is not None
+        with use_primary() if fresh else nullcontext():
+            page_obj = _feed_paginator().get_page(page_number)
+            html = _render(page_obj)
+        if page_obj.number == page_number:
+            # out-of-range numbers fall back to the last page; don't cache those
+            cache.set(key, html, settings.EVENT_FEED_CACHE_TIMEOUT)
+    return html
+
+
+async def arender_feed_page(page_number):
+    """render_feed_page() for async views, reading with the async ORM."""
+    key = f'p_event_feed:v{await _afeed_version()}:page:{page_number}'
+    html = await cache.aget(key)
+    if html is None:
+        fresh = await cache.aget(FEED_CHANGED_KEY) is not None
+        with use_primary() if fresh else nullcontext():
+            paginator = _feed_paginator()
+            paginator.count = await paginator.object_list.acount()
+            page_obj = paginator.get_page(page_number)
+            # fetch the page now; the template must not query from the event loop
+            page_obj.object_list = [event async for event in page_obj.object_list]
+        html = await sync_to_async(_render)(page_obj)
+        if page_obj.number == page_number:
+            await cache.aset(key, html, settings.EVENT_FEED_CACHE_TIMEOUT)
+    return html
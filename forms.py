@@ -1,5 +1,7 @@
+from asgiref.sync import sync_to_async
 from django import forms
-from .models import Participation, SNACK_ITEMS, FULL_MEAL_ITEMS, LOCATION_CHOICES
+from .models import CateringSelection, Participation, VenueBooking, SNACK_ITEMS, FULL_MEAL_ITEMS, LOCATION_CHOICES
+from .venues import venue_catalog
 
 CATERING_TYPES = [
     ('none', 'None'),
@@ -7,22 +9,6 @@ CATERING_TYPES = [
     ('full', 'Full Meal'),
 ]
 
-# venue mapping — update names as you like
-VENUE_OPTIONS = {
-    "agrabad": ["Classic world convention Hall", "Hotel Agrabad", "Abdullah convention Hall", "VIP Banquet", 
-                "The Green Shadow Rasturant", "The village Rasturant", "Bir Bangali Rasturant", "Hotel Rahman & Rasturant"],
-    "bohoddarhat": ["Ahad Convention Hall", "AK convention Hall", "RB convention Hall", "Hall-7 Convention center", 
-                "Din Mohammad Convention Hall", "Handi Rasturant", "Barcode Food Junction", "Hotel Zaman & Rasturant"],
-    "chawkbazar": ["Al-Razzaque Convention Hall", "New Shapla Banquet Hall", "City View Banquet Hall", "Blue Ocean Banquet Hall", 
-            "The Food Court Rasturant", "The Tasty Treat Rasturant", "Spicy Villa Rasturant", "Hotel Sea Crown & Rasturant"],
-    "gec": ["K & K Convention Hall", "Royal Garden Banquet Hall", "Grand Plaza Banquet Hall", "Sky View Banquet Hall", 
-            "The Royal Feast Rasturant", "The Grand Treat Rasturant", "Spicey Treat Rasturant", "Hotel Alif & Rasturant"],
-    "jamal_khan": ["JK Convention Hall", "City Heart Banquet Hall", "Sunset Banquet Hall", "Dawaat Rasturant", 
-            "Royal Feast Rasturant", "Tasty Treat Rasturant", "Food Villa Rasturant", "Hotel Imperial & Rasturant"],
-    "new_market": ["Elite Banquet Hall", "Majestic Banquet Hall", "Food Court Rasturant", 
-            "The Royal Dine Rasturant", "Yummy Treat Rasturant", "Gourmet Villa Rasturant", "Hotel Crown & Rasturant"],
-}
-
 class ParticipationForm(forms.ModelForm):
     # Basic info (you can omit these if you want ModelForm to render them automatically)
     name = forms.CharField(max_length=100)
@@ -78,23 +64,47 @@ class ParticipationForm(forms.ModelForm):
             'file', 'consent'
         ]
 
+    # clean() looks the venue/date up in VenueBooking; ais_valid() does it with the async ORM
+    check_availability = True
+
     def __init__(self, *args, **kwargs):
         # allow passing an initial location so venue list is pre-populated
         super().__init__(*args, **kwargs)
+        self._editing = self.instance.pk is not None
         # initial venue options (based on POST or instance)
         loc = None
         if self.is_bound:
             loc = self.data.get('location')
         elif self.instance and self.instance.location:
             loc = self.instance.location
+        self._set_venue_choices(loc)
 
-        # populate venue choices if location is known
-        if loc and loc in VENUE_OPTIONS:
-            self.fields['venue'].choices = [(v, v) for v in VENUE_OPTIONS[loc]]
+    def _set_venue_choices(self, loc):
+        # populate venue choices if location is known (Venue rows, served from memory)
+        choices = venue_catalog.choices(loc) if loc else []
+        if choices:
+            self.fields['venue'].choices = choices
         else:
             # keep venue optional and empty options so validation won't fail
             self.fields['venue'].choices = [('', '--- Select a Location first ---')]
 
+    def rebind(self, data, files=None):
+        """
+        Validate another submission with this form, for bulk imports.
+
+        Building a form deep-copies every field (and their long choice lists);
+        rebinding reuses the copies and only resets the per-submission state.
+        """
+        self.data = data
+        self.files = files or {}
+        self.is_bound = True
+        self._errors = None
+        self._bound_fields_cache = {}
+        self.instance = self._meta.model()
+        self._editing = False
+        self._set_venue_choices(data.get('location'))
+        return self
+
     def clean(self):
         cleaned = super().clean()
         catering_type = cleaned.get("catering_type")
@@ -107,7 +117,7 @@ class ParticipationForm(forms.ModelForm):
         if catering_type == "full" and not fullmeal_items:
             raise forms.ValidationError("Select at least one full meal item.")
 
-        # merge chosen items into a single list that will be saved into JSONField
+        # merge chosen items into a single list, saved as CateringSelection rows
         if catering_type == "snacks":
             cleaned["catering_items"] = snack_items
         elif catering_type == "full":
@@ -115,17 +125,52 @@ class ParticipationForm(forms.ModelForm):
         else:
             cleaned["catering_items"] = []
 
-        return cleaned
-
-    def save(self, commit=True):
-      instance = super().save(commit=False)
-
-    # Save catering items properly
-      cleaned = self.cleaned_data
-      instance.catering_items = cleaned.get("catering_items", [])
+        if self.check_availability and self._booked_slot(cleaned).exists():
+            self._reject_booked_slot(cleaned)
 
-      if commit:
-        instance.save()
+        return cleaned
 
-      return instance
+    def _booked_slot(self, cleaned):
+        if not (cleaned.get("venue") and cleaned.get("preferred_date")):
+            return VenueBooking.objects.none()
+        slot = VenueBooking.slot(cleaned.get("location"), cleaned["venue"], cleaned["preferred_date"])
+        if self._editing:
+            slot = slot.exclude(participation=self.instance)
+        return slot
+
+    def _reject_booked_slot(self, cleaned):
+        self.add_error(
+            "preferred_date",
+            f"{cleaned['venue']} is already booked on {cleaned['preferred_date']}. Please pick another date.",
+        )
+
+    async def ais_valid(self):
+        """is_valid() for async views."""
+        self.check_availability = False
+        # field cleaning (and the upload's temporary file) is blocking
+        if not await sync_to_async(self.is_valid)():
+            return False
+        if await self._booked_slot(self.cleaned_data).aexists():
+            self._reject_booked_slot(self.cleaned_data)
+            return False
+        return True
+
+    def _catering_rows(self):
+        return [
+            CateringSelection(participation=self.instance, item=item)
+            for item in self.cleaned_data.get("catering_items", [])
+        ]
 
+    def _save_m2m(self):
+        super()._save_m2m()
+        # chosen catering items become CateringSelection rows
+        if self._editing:
+            self.instance.catering_selections.all().delete()
+        CateringSelection.objects.bulk_create(self._catering_rows())
+
+    async def asave(self):
+        """save() for async views; new submissions only."""
+        instance = self.save(commit=False)
+        await instance.asave()
+        await CateringSelection.objects.abulk_create(self._catering_rows())
+        return instance
@@ -0,0 +1,83 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.hashers import (
+    Argon2PasswordHasher,
+    PBKDF2PasswordHasher,
+    ScryptPasswordHasher,
+    check_password,
+    make_password,
+)
+
+# ------------------------------
+# Hashers with per-deployment cost
+# ------------------------------
+# The algorithm names are Django's own, so existing hashes keep verifying; when
+# the configured cost differs from a stored hash's, must_update() is true and
+# UserAccount.check_password re-hashes on the next successful login.
+
+class TunablePBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    @property
+    def iterations(self):
+        return settings.PASSWORD_HASH_PBKDF2_ITERATIONS
+
+
+class TunableScryptPasswordHasher(ScryptPasswordHasher):
+    @property
+    def work_factor(self):
+        return settings.PASSWORD_HASH_SCRYPT_WORK_FACTOR
+
+
+class TunableArgon2PasswordHasher(Argon2PasswordHasher):
+    # needs the optional argon2-cffi package, loaded on first use
+    @property
+    def time_cost(self):
+        return settings.PASSWORD_HASH_ARGON2_TIME_COST
+
+    @property
+    def memory_cost(self):
+        return settings.PASSWORD_HASH_ARGON2_MEMORY_COST
+
+
+# ------------------------------
+# Verification (optionally offloaded)
+# ------------------------------
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=settings.PASSWORD_HASH_WORKERS,
+                    thread_name_prefix='password-hash',
+                )
+    return _executor
+
+
+def _verify(raw_password, encoded):
+    upgraded = []
+    is_correct = check_password(
+        raw_password, encoded, setter=lambda raw: upgraded.append(make_password(raw))
+    )
+    return is_correct, (upgraded[0] if upgraded else None)
+
+
+def verify_password(raw_password, encoded):
+    """
+    Check ``raw_password`` against ``encoded``.
+
+    Returns ``(is_correct, new_encoded)`` where ``new_encoded`` is a fresh hash
+    when the stored one uses an outdated algorithm or cost, else None.  With
+    ``PASSWORD_HASH_OFFLOAD`` the hashing runs in a pool of at most
+    ``PASSWORD_HASH_WORKERS`` threads, so a login burst queues for hashing
+    instead of every server thread burning CPU at once.
+    """
+    if not settings.PASSWORD_HASH_OFFLOAD:
+        return _verify(raw_password, encoded)
+    return _get_executor().submit(_verify, raw_password, encoded).result()
+
@@ -0,0 +1,291 @@
+import atexit
+import glob
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import InterfaceError, OperationalError, connection, transaction
+
+from .facets import count_added
+from .models import CateringSelection, Participation
+
+try:
+    import fcntl
+except ImportError:  # Windows: only one process may use a journal directory
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_NAME = 'submissions.jsonl'
+SEALED_PATTERN = 'submissions.*.sealed'
+QUARANTINE_SUFFIX = '.failed'
+DRAIN_LOCK_NAME = 'drain.lock'
+# Participation columns carried in a journal record (plus 'receipt' and 'catering_items')
+JOURNALED_FIELDS = (
+    'name', 'email', 'idea_title', 'description', 'category', 'budget_estimate',
+    'preferred_date', 'catering_type', 'location', 'venue', 'file', 'consent',
+)
+
+
+def _lock(fd, blocking=True):
+    if fcntl is None:
+        return True
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        return False
+    return True
+
+
+def _inode(path):
+    try:
+        return os.stat(path).st_ino
+    except FileNotFoundError:
+        return None
+
+
+class SubmissionJournal:
+    """
+    Durable write-behind queue for participate submissions.
+
+    ``append()`` writes one JSON line to ``SUBMISSION_JOURNAL_DIR/submissions.jsonl``
+    and fsyncs it before returning the receipt id, so an answered submission
+    is on disk.  ``drain()`` renames that file aside (``*.sealed``; writers
+    then start a new one), inserts its records with bulk_create in batches of
+    ``SUBMISSION_DRAIN_BATCH_SIZE`` and deletes it.  After a crash the sealed
+    and active files are simply drained again; records whose receipt is
+    already in the database are skipped, so nothing is lost or doubled.  A
+    file whose records cannot be inserted is renamed to ``*.failed`` and
+    skipped (``drain_submissions --retry-failed`` puts it back); one bad
+    record no longer holds up the files after it.
+
+    Every process appends to the same file under an flock; one drainer at a
+    time holds ``drain.lock``.  With ``SUBMISSION_DRAIN_IN_BACKGROUND`` each
+    process also drains every ``SUBMISSION_DRAIN_INTERVAL_MS`` in a daemon
+    thread; ``manage.py drain_submissions`` does the same as a worker.
+    """
+
+    def __init__(self):
+        self._thread_lock = threading.Lock()
+        self._drain_lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._thread = None
+
+        # counters, see stats()
+        self.appended = 0
+        self.drained = 0
+        self.skipped = 0
+        self.failed_drains = 0
+        self.quarantined = 0
+        self.last_drain_ms = 0.0
+
+    @property
+    def directory(self):
+        return str(settings.SUBMISSION_JOURNAL_DIR)
+
+    def _path(self, name):
+        return os.path.join(self.directory, name)
+
+    # -------------------------------------------------
+    # writing
+    # -------------------------------------------------
+    def append(self, record):
+        """Durably store ``record`` (a dict of JSON-able values); returns its receipt id."""
+        receipt = uuid.uuid4().hex
+        data = (json.dumps({'receipt': receipt, **record}, cls=DjangoJSONEncoder) + '\n').encode()
+        path = self._path(ACTIVE_NAME)
+        os.makedirs(self.directory, exist_ok=True)
+        with self._thread_lock:
+            while True:
+                fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+                try:
+                    _lock(fd)
+                    # sealed while we waited for the lock: append to the new file
+                    if os.fstat(fd).st_ino != _inode(path):
+                        continue
+                    os.write(fd, data)
+                    os.fsync(fd)
+                    break
+                finally:
+                    os.close(fd)  # also releases the flock
+        self.appended += 1
+
+        if getattr(settings, 'SUBMISSION_DRAIN_IN_BACKGROUND', True):
+            self._ensure_started()
+        return receipt
+
+    def _seal(self):
+        """Move the active file aside for draining; appends go to a fresh file."""
+        path = self._path(ACTIVE_NAME)
+        try:
+            fd = os.open(path, os.O_RDONLY)
+        except FileNotFoundError:
+            return
+        try:
+            _lock(fd)
+            if os.fstat(fd).st_size and os.fstat(fd).st_ino == _inode(path):
+                os.rename(path, self._path(f'submissions.{time.time_ns()}.sealed'))
+        finally:
+            os.close(fd)
+
+    # -------------------------------------------------
+    # draining
+    # -------------------------------------------------
+    def drain(self):
+        """Insert every journaled submission; returns how many rows were inserted."""
+        if not os.path.isdir(self.directory):
+            return 0
+        with self._drain_lock:
+            lock_fd = os.open(self._path(DRAIN_LOCK_NAME), os.O_WRONLY | os.O_CREAT, 0o600)
+            try:
+                if not _lock(lock_fd, blocking=False):
+                    return 0  # another process is draining
+                self._seal()
+                inserted = 0
+                started = time.perf_counter()
+                for path in sorted(glob.glob(self._path(SEALED_PATTERN))):
+                    try:
+                        inserted += self._replay(path)
+                    except (OperationalError, InterfaceError):
+                        # database unavailable: left on disk and retried on the next drain
+                        self.failed_drains += 1
+                        logger.exception("Could not drain submission journal %s", path)
+                        break
+                    except Exception:
+                        # a record the database won't take: set the file aside
+                        self.failed_drains += 1
+                        self.quarantined += 1
+                        logger.exception("Could not drain submission journal %s; moved to %s%s",
+                                         path, path, QUARANTINE_SUFFIX)
+                        os.rename(path, path + QUARANTINE_SUFFIX)
+                        continue
+                    os.remove(path)
+                self.last_drain_ms = (time.perf_counter() - started) * 1000
+                return inserted
+            finally:
+                os.close(lock_fd)
+
+    def _replay(self, path):
+        inserted = 0
+        batch = []
+        with open(path, 'rb') as journal:
+            for line_no, line in enumerate(journal, start=1):
+                try:
+                    batch.append(json.loads(line))
+                except ValueError:
+                    # torn write from a crash before fsync returned; that
+                    # submission was never acknowledged
+                    logger.warning("Skipping unreadable line %d of %s", line_no, path)
+                    continue
+                if len(batch) >= settings.SUBMISSION_DRAIN_BATCH_SIZE:
+                    inserted += self._insert(batch)
+                    batch = []
+        return inserted + self._insert(batch)
+
+    def retry_failed(self):
+        """Queue the quarantined files for the next drain again; returns how many there were."""
+        paths = glob.glob(self._path(SEALED_PATTERN + QUARANTINE_SUFFIX))
+        for path in paths:
+            os.rename(path, path[:-len(QUARANTINE_SUFFIX)])
+        return len(paths)
+
+    def _insert(self, records):
+        if not records:
+            return 0
+        with transaction.atomic():
+            done = set(
+                Participation.objects
+                .filter(receipt__in=[record['receipt'] for record in records])
+                .values_list('receipt', flat=True)
+            )
+            records = [record for record in records if record['receipt'] not in done]
+            created = Participation.objects.bulk_create([_participation(record) for record in records])
+            CateringSelection.objects.bulk_create([
+                CateringSelection(participation=instance, item=item)
+                for instance, record in zip(created, records)
+                for item in record['catering_items']
+            ])
+            count_added(created)
+        self.skipped += len(done)
+        self.drained += len(created)
+        return len(created)
+
+    def backlog_bytes(self):
+        """Size of the journal files not drained yet."""
+        paths = glob.glob(self._path(SEALED_PATTERN)) + [self._path(ACTIVE_NAME)]
+        return sum(os.path.getsize(path) for path in paths if os.path.exists(path))
+
+    def stats(self):
+        return {
+            'backlog_bytes': self.backlog_bytes(),
+            'appended': self.appended,
+            'drained': self.drained,
+            'skipped': self.skipped,
+            'failed_drains': self.failed_drains,
+            'quarantined': self.quarantined,
+            'last_drain_ms': self.last_drain_ms,
+        }
+
+    # -------------------------------------------------
+    # background drainer
+    # -------------------------------------------------
+    def shutdown(self):
+        self._stopping.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        self.drain()
+
+    def start(self):
+        """Start the background drainer; its first pass replays files left by a previous run."""
+        self._ensure_started()
+
+    def _ensure_started(self):
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name='submission-drainer', daemon=True
+                )
+                self._thread.start()
+                atexit.register(self.shutdown)
+
+    def _run(self):
+        interval = settings.SUBMISSION_DRAIN_INTERVAL_MS / 1000
+        try:
+            while not self._stopping.is_set():
+                self.drain()
+                self._wake.wait(interval)
+                self._wake.clear()
+        finally:
+            connection.close()
+
+
+def _participation(record):
+    fields = {name: Participation._meta.get_field(name).to_python(record[name]) for name in JOURNALED_FIELDS}
+    return Participation(receipt=record['receipt'], **fields)
+
+
+submission_journal = SubmissionJournal()
+
+
+def journal_submission(form):
+    """
+    Journal a validated ParticipationForm instead of saving it; returns the
+    receipt id.  The upload is stored now (content-addressed), so the journal
+    only carries its name.
+    """
+    instance = form.save(commit=False)
+    Participation._meta.get_field('file').pre_save(instance, add=True)
+    record = {name: Participation._meta.get_field(name).value_from_object(instance) for name in JOURNALED_FIELDS}
+    record['file'] = instance.file.name or None
+    record['catering_items'] = list(form.cleaned_data.get('catering_items', []))
+    return submission_journal.append(record)
@@ -0,0 +1,209 @@
+import atexit
+import logging
+import queue
+import threading
+import time
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from django.db.models import Count, Max, Min
+from django.db.models.functions import TruncDate
+
+from .models import LoginDailySummary, LoginHistory
+
+logger = logging.getLogger(__name__)
+
+
+class LoginHistoryWriter:
+    """
+    Buffers LoginHistory rows in memory and writes them with bulk_create.
+
+    ``record()`` only enqueues; a daemon thread flushes every
+    ``LOGIN_HISTORY_BATCH_SIZE`` rows or ``LOGIN_HISTORY_FLUSH_INTERVAL_MS``
+    milliseconds, whichever comes first, and once more at interpreter shutdown.
+    With ``LOGIN_HISTORY_ASYNC = False`` every row is written inline instead.
+    """
+
+    def __init__(self):
+        self._queue = queue.Queue()
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._flush_lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._thread = None
+
+        # counters, see stats()
+        self.enqueued = 0
+        self.written = 0
+        self.failed = 0
+        self.flushes = 0
+        self.last_flush_ms = 0.0
+        self.max_flush_ms = 0.0
+        self.total_flush_ms = 0.0
+
+    def record(self, user, email):
+        self._queue.put(LoginHistory(user=user, email=email))
+        self.enqueued += 1
+
+        if not getattr(settings, 'LOGIN_HISTORY_ASYNC', True):
+            self.flush()
+            return
+
+        self._ensure_started()
+        if self._queue.qsize() >= settings.LOGIN_HISTORY_BATCH_SIZE:
+            self._wake.set()
+
+    def flush(self):
+        """Write everything queued so far; returns the number of rows written."""
+        written = 0
+        with self._flush_lock:
+            while True:
+                batch = self._drain(settings.LOGIN_HISTORY_BATCH_SIZE)
+                if not batch:
+                    break
+                started = time.perf_counter()
+                try:
+                    LoginHistory.objects.bulk_create(batch)
+                except Exception:
+                    self.failed += len(batch)
+                    logger.exception("Could not write %d login history rows", len(batch))
+                    continue
+                elapsed_ms = (time.perf_counter() - started) * 1000
+                written += len(batch)
+                self.written += len(batch)
+                self.flushes += 1
+                self.last_flush_ms = elapsed_ms
+                self.total_flush_ms += elapsed_ms
+                self.max_flush_ms = max(self.max_flush_ms, elapsed_ms)
+        return written
+
+    def shutdown(self):
+        self._stopping.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        self.flush()
+
+    def stats(self):
+        return {
+            'queue_depth': self._queue.qsize(),
+            'enqueued': self.enqueued,
+            'written': self.written,
+            'failed': self.failed,
+            'flushes': self.flushes,
+            'last_flush_ms': self.last_flush_ms,
+            'max_flush_ms': self.max_flush_ms,
+            'avg_flush_ms': self.total_flush_ms / self.flushes if self.flushes else 0.0,
+        }
+
+    def _drain(self, limit):
+        batch = []
+        while len(batch) < limit:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _ensure_started(self):
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name='login-history-writer', daemon=True
+                )
+                self._thread.start()
+                atexit.register(self.shutdown)
+
+    def _run(self):
+        interval = settings.LOGIN_HISTORY_FLUSH_INTERVAL_MS / 1000
+        try:
+            while not self._stopping.is_set():
+                self._wake.wait(interval)
+                self._wake.clear()
+                # like a request: drop a connection that broke or outlived
+                # CONN_MAX_AGE before and after using it
+                close_old_connections()
+                try:
+                    self.flush()
+                finally:
+                    close_old_connections()
+        finally:
+            connection.close()
+
+
+login_history_writer = LoginHistoryWriter()
+
+
+def roll_up_login_history(cutoff, batch_size=None, pause=0.0):
+    """
+    Fold LoginHistory rows older than ``cutoff`` into LoginDailySummary and
+    delete them.
+
+    Each batch of at most ``batch_size`` rows (oldest ids first) is summarised
+    and deleted in its own short transaction, so logins keep being written
+    while this runs; ``pause`` seconds are slept between batches.  Returns the
+    number of raw rows removed.
+    """
+    batch_size = batch_size or settings.LOGIN_HISTORY_PRUNE_BATCH_SIZE
+    old = LoginHistory.objects.filter(login_time__lt=cutoff)
+    removed = 0
+    while True:
+        with transaction.atomic():
+            # bound the batch by an id range rather than a list of ids
+            boundary = list(old.order_by('id').values_list('id', flat=True)[batch_size - 1:batch_size])
+            batch = old.filter(id__lte=boundary[0]) if boundary else old
+            by_day = batch.annotate(day=TruncDate('login_time'))
+            groups = list(
+                by_day.values('user_id', 'day')
+                .annotate(logins=Count('id'), first=Min('login_time'), last=Max('login_time'))
+                .order_by()
+            )
+            if not groups:
+                break
+            # the email of each group's last login (later rows overwrite earlier ones)
+            emails = {
+                (user_id, day): email
+                for user_id, day, email in by_day.order_by('login_time', 'id').values_list('user_id', 'day', 'email')
+            }
+            for group in groups:
+                group['email'] = emails[group['user_id'], group['day']]
+            _merge_into_summaries(groups)
+            deleted, _ = batch.delete()
+        removed += deleted
+        if pause:
+            time.sleep(pause)
+    return removed
+
+
+def _merge_into_summaries(groups):
+    days = [group['day'] for group in groups]
+    existing = {
+        (summary.user_id, summary.day): summary
+        for summary in LoginDailySummary.objects.filter(
+            user_id__in={group['user_id'] for group in groups},
+            day__range=(min(days), max(days)),
+        )
+    }
+    created, updated = [], []
+    for group in groups:
+        summary = existing.get((group['user_id'], group['day']))
+        if summary is None:
+            created.append(LoginDailySummary(
+                user_id=group['user_id'],
+                email=group['email'],
+                day=group['day'],
+                login_count=group['logins'],
+                first_login=group['first'],
+                last_login=group['last'],
+            ))
+        else:
+            summary.login_count += group['logins']
+            summary.first_login = min(summary.first_login, group['first'])
+            if group['last'] > summary.last_login:
+                summary.last_login = group['last']
+                summary.email = group['email']
+            updated.append(summary)
+    LoginDailySummary.objects.bulk_create(created)
+    LoginDailySummary.objects.bulk_update(updated, ['email', 'login_count', 'first_login', 'last_login'])
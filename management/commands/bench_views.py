@@ -0,0 +1,125 @@
+import asyncio
+import io
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.sessions.backends.cached_db import SessionStore
+from django.core.handlers.asgi import ASGIHandler
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand, CommandError
+
+from EventApp.models import UserAccount
+
+BENCH_EMAIL = 'bench@{role}.invalid'
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare requests/s and latency of the WSGI deployment (sync views) "
+        "and the ASGI deployment (async views) for one page, at a given "
+        "concurrency. Requests go straight to Django's handlers, no server."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--path', default='/events/', help="Page to request (default: the feed).")
+        parser.add_argument('--role', default='participant', choices=['participant', 'organizer'])
+        parser.add_argument('--requests', type=int, default=2000)
+        parser.add_argument('--concurrency', type=int, default=64)
+        parser.add_argument('--mode', choices=['both', 'wsgi', 'asgi'], default='both')
+
+    def handle(self, *args, **options):
+        if options['mode'] == 'both':
+            # views.py picks sync/async views at import, so each mode gets its own process
+            for mode, async_views in (('wsgi', '0'), ('asgi', '1')):
+                argv = [sys.executable, sys.argv[0], 'bench_views', '--mode', mode,
+                        '--path', options['path'], '--role', options['role'],
+                        '--requests', str(options['requests']), '--concurrency', str(options['concurrency'])]
+                subprocess.run(argv, env={**os.environ, 'ASYNC_VIEWS': async_views}, check=True)
+            return
+
+        if (options['mode'] == 'asgi') != settings.ASYNC_VIEWS:
+            raise CommandError("Run --mode asgi with ASYNC_VIEWS=1 and --mode wsgi without it.")
+
+        cookie = f'{settings.SESSION_COOKIE_NAME}={self._session(options["role"])}'
+        run = self._run_asgi if options['mode'] == 'asgi' else self._run_wsgi
+        run(options['path'], cookie, 50, options['concurrency'])  # warm up caches and connections
+        started = time.perf_counter()
+        latencies, statuses = run(options['path'], cookie, options['requests'], options['concurrency'])
+        elapsed = time.perf_counter() - started
+
+        latencies.sort()
+        p50 = latencies[len(latencies) // 2]
+        p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+        bad = sum(1 for status in statuses if status != 200)
+        self.stdout.write(
+            f"{options['mode']:<5} {options['path']}  c={options['concurrency']}  "
+            f"{len(latencies) / elapsed:8.0f} req/s  p50={p50:.1f}ms  p99={p99:.1f}ms  non-200={bad}"
+        )
+
+    def _session(self, role):
+        user, _ = UserAccount.objects.get_or_create(email=BENCH_EMAIL.format(role=role), defaults={'role': role})
+        session = SessionStore()
+        session['user_id'] = user.id
+        session['role'] = role
+        session.save()
+        return session.session_key
+
+    def _run_wsgi(self, path, cookie, count, concurrency):
+        handler = WSGIHandler()
+
+        def one(_):
+            environ = {
+                'REQUEST_METHOD': 'GET', 'PATH_INFO': path, 'QUERY_STRING': '', 'SCRIPT_NAME': '',
+                'SERVER_NAME': 'localhost', 'SERVER_PORT': '80', 'SERVER_PROTOCOL': 'HTTP/1.1',
+                'HTTP_HOST': 'localhost', 'HTTP_COOKIE': cookie,
+                'wsgi.input': io.BytesIO(), 'wsgi.url_scheme': 'http', 'wsgi.errors': sys.stderr,
+            }
+            status = []
+            started = time.perf_counter()
+            response = handler(environ, lambda s, headers, exc_info=None: status.append(s))
+            b''.join(response)
+            response.close()
+            return (time.perf_counter() - started) * 1000, int(status[0].split()[0])
+
+        with ThreadPoolExecutor(concurrency) as pool:
+            results = list(pool.map(one, range(count)))
+        return [ms for ms, _ in results], [status for _, status in results]
+
+    def _run_asgi(self, path, cookie, count, concurrency):
+        handler = ASGIHandler()
+        scope = {
+            'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET',
+            'scheme': 'http', 'path': path, 'raw_path': path.encode(), 'root_path': '',
+            'query_string': b'', 'server': ('localhost', 80), 'client': ('127.0.0.1', 0),
+            'headers': [(b'host', b'localhost'), (b'cookie', cookie.encode())],
+        }
+
+        async def one(limit):
+            async with limit:
+                status = []
+                sent = asyncio.Event()
+
+                async def receive():
+                    if not sent.is_set():
+                        sent.set()
+                        return {'type': 'http.request', 'body': b'', 'more_body': False}
+                    await asyncio.Event().wait()  # client never disconnects
+
+                async def send(message):
+                    if message['type'] == 'http.response.start':
+                        status.append(message['status'])
+
+                started = time.perf_counter()
+                await handler(dict(scope), receive, send)
+                return (time.perf_counter() - started) * 1000, status[0]
+
+        async def main():
+            limit = asyncio.Semaphore(concurrency)
+            return await asyncio.gather(*(one(limit) for _ in range(count)))
+
+        results = asyncio.run(main())
+        return [ms for ms, _ in results], [status for _, status in results]
@@ -0,0 +1,67 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+
+from EventApp import hashers
+
+# (label, algorithm, cost settings)
+PROFILES = [
+    ('pbkdf2 1M', 'pbkdf2', {'PASSWORD_HASH_PBKDF2_ITERATIONS': 1_000_000}),
+    ('pbkdf2 600k', 'pbkdf2', {'PASSWORD_HASH_PBKDF2_ITERATIONS': 600_000}),
+    ('pbkdf2 260k', 'pbkdf2', {'PASSWORD_HASH_PBKDF2_ITERATIONS': 260_000}),
+    ('scrypt n=2^14', 'scrypt', {'PASSWORD_HASH_SCRYPT_WORK_FACTOR': 2**14}),
+    ('scrypt n=2^13', 'scrypt', {'PASSWORD_HASH_SCRYPT_WORK_FACTOR': 2**13}),
+    ('argon2 t=2 m=100MiB', 'argon2', {'PASSWORD_HASH_ARGON2_TIME_COST': 2, 'PASSWORD_HASH_ARGON2_MEMORY_COST': 102400}),
+    ('argon2 t=1 m=64MiB', 'argon2', {'PASSWORD_HASH_ARGON2_TIME_COST': 1, 'PASSWORD_HASH_ARGON2_MEMORY_COST': 65536}),
+]
+
+
+class Command(BaseCommand):
+    help = "Benchmark password verification (logins/second) for each hasher setting."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--logins', type=int, default=40, help="Verifications per profile.")
+        parser.add_argument('--threads', type=int, default=8, help="Concurrent callers (server threads).")
+        parser.add_argument('--offload', action='store_true',
+                            help="Verify through the bounded pool (PASSWORD_HASH_OFFLOAD).")
+        parser.add_argument('--only', help="Run only profiles whose label starts with this.")
+
+    def handle(self, *args, **options):
+        self.stdout.write(
+            f"{'profile':<22}{'logins/s':>10}{'ms/login':>10}   "
+            f"(threads={options['threads']}, offload={options['offload']}, "
+            f"pool={settings.PASSWORD_HASH_WORKERS})"
+        )
+        for label, algorithm, cost in PROFILES:
+            if options['only'] and not label.startswith(options['only']):
+                continue
+            hasher_path = settings.PASSWORD_HASH_ALGORITHMS[algorithm]
+            with override_settings(
+                PASSWORD_HASHERS=[hasher_path],
+                PASSWORD_HASH_OFFLOAD=options['offload'],
+                **cost,
+            ):
+                try:
+                    rate = self._bench(options['logins'], options['threads'])
+                except ValueError as exc:  # e.g. argon2-cffi not installed
+                    self.stdout.write(f"{label:<22}{'skipped':>10}   {exc}")
+                    continue
+            self.stdout.write(f"{label:<22}{rate:>10.1f}{1000 / rate:>10.1f}")
+
+    def _bench(self, logins, threads):
+        encoded = make_password('correct horse battery staple')
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            results = list(pool.map(
+                lambda _: hashers.verify_password('correct horse battery staple', encoded),
+                range(logins),
+            ))
+        elapsed = time.perf_counter() - started
+        failed = sum(1 for ok, _ in results if not ok)
+        if failed:
+            raise CommandError(f"{failed} of {logins} logins failed to verify the password they were hashed from.")
+        return logins / elapsed
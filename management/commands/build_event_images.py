@@ -0,0 +1,110 @@
+import hashlib
+import io
+import json
+from pathlib import Path
+
+from django.apps import apps
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+SOURCE_SUFFIXES = {'.png', '.jpg', '.jpeg'}
+SAVE_OPTIONS = {
+    'webp': {'quality': 78, 'method': 6},
+    'avif': {'quality': 55},
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate resized WebP/AVIF variants of the event artwork in "
+        "static/EventApp/eventpics/ with content-hashed names, plus the manifest "
+        "read by the {% responsive_image %} template tag."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help="Rebuild variants of unchanged images.")
+
+    def handle(self, *args, **options):
+        try:
+            from PIL import Image, features
+        except ImportError:
+            raise CommandError("build_event_images needs Pillow (pip install Pillow).")
+
+        static_root = Path(apps.get_app_config('EventApp').path) / 'static'
+        source_dir = static_root / 'EventApp' / 'eventpics'
+        variants_dir = source_dir / 'variants'
+        variants_dir.mkdir(parents=True, exist_ok=True)
+        manifest_path = variants_dir / 'manifest.json'
+
+        formats = [fmt for fmt in settings.EVENT_IMAGE_FORMATS if features.check(fmt)]
+        skipped = set(settings.EVENT_IMAGE_FORMATS) - set(formats)
+        if skipped:
+            self.stderr.write(f"Pillow lacks support for {', '.join(sorted(skipped))}; skipping.")
+
+        old_manifest = json.loads(manifest_path.read_text()) if manifest_path.exists() else {}
+        manifest = {}
+        before = after = 0
+
+        for source in sorted(source_dir.iterdir()):
+            if source.suffix.lower() not in SOURCE_SUFFIXES:
+                continue
+            static_path = source.relative_to(static_root).as_posix()
+            data = source.read_bytes()
+            source_hash = hashlib.sha256(data).hexdigest()
+
+            entry = old_manifest.get(static_path)
+            if (not options['force'] and entry and entry['source_sha256'] == source_hash
+                    and set(entry['variants']) == set(formats)
+                    and all((static_root / path).exists()
+                            for variants in entry['variants'].values() for _, path in variants)):
+                manifest[static_path] = entry
+                continue
+
+            with Image.open(io.BytesIO(data)) as image:
+                image.load()
+                if image.mode not in ('RGB', 'RGBA'):
+                    has_alpha = image.mode in ('LA', 'PA') or 'transparency' in image.info
+                    image = image.convert('RGBA' if has_alpha else 'RGB')
+                entry = {
+                    'source_sha256': source_hash,
+                    'width': image.width,
+                    'height': image.height,
+                    'variants': {},
+                }
+                widths = sorted({min(w, image.width) for w in settings.EVENT_IMAGE_WIDTHS})
+                for fmt in formats:
+                    entry['variants'][fmt] = []
+                    for width in widths:
+                        height = round(image.height * width / image.width)
+                        resized = image if width == image.width else image.resize((width, height), Image.LANCZOS)
+                        buffer = io.BytesIO()
+                        resized.save(buffer, fmt.upper(), **SAVE_OPTIONS.get(fmt, {}))
+                        content = buffer.getvalue()
+                        digest = hashlib.sha256(content).hexdigest()[:12]
+                        name = f"{source.stem.replace(' ', '-')}-{width}w.{digest}.{fmt}"
+                        (variants_dir / name).write_bytes(content)
+                        entry['variants'][fmt].append([width, (variants_dir / name).relative_to(static_root).as_posix()])
+            manifest[static_path] = entry
+            self.stdout.write(f"  {static_path}: {len(widths)} widths x {', '.join(formats)}")
+
+        # drop variants no longer referenced by the manifest
+        referenced = {
+            path for entry in manifest.values()
+            for variants in entry['variants'].values() for _, path in variants
+        }
+        for stale in variants_dir.iterdir():
+            if stale != manifest_path and stale.relative_to(static_root).as_posix() not in referenced:
+                stale.unlink()
+
+        manifest_path.write_text(json.dumps(manifest, indent=2, sort_keys=True))
+
+        for static_path, entry in manifest.items():
+            before += (static_root / static_path).stat().st_size
+            # the largest variant of the preferred format is the worst case a browser fetches
+            preferred = next(iter(entry['variants'].values()), [])
+            if preferred:
+                after += (static_root / preferred[-1][1]).stat().st_size
+        self.stdout.write(self.style.SUCCESS(
+            f"{len(manifest)} images: {before / 1024:.0f} KB originals -> "
+            f"{after / 1024:.0f} KB largest variants. Manifest: {manifest_path}"
+        ))
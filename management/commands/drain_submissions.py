@@ -0,0 +1,38 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from EventApp.journal import submission_journal
+
+
+class Command(BaseCommand):
+    help = (
+        "Insert the write-behind submissions from SUBMISSION_JOURNAL_DIR into the "
+        "database, including any left over from a crash. Runs as a worker "
+        "unless --once is given."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help="Drain what is there and exit.")
+        parser.add_argument('--retry-failed', action='store_true',
+                            help="Drain the files set aside as *.failed again.")
+        parser.add_argument('--interval', type=float, default=None,
+                            help="Seconds between drains (default: SUBMISSION_DRAIN_INTERVAL_MS).")
+
+    def handle(self, *args, **options):
+        interval = options['interval'] if options['interval'] is not None else settings.SUBMISSION_DRAIN_INTERVAL_MS / 1000
+        self.stdout.write(f"Journal: {submission_journal.directory}")
+        if options['retry_failed']:
+            self.stdout.write(f"Retrying {submission_journal.retry_failed()} failed journal files.")
+        while True:
+            inserted = submission_journal.drain()
+            if inserted or options['once']:
+                stats = submission_journal.stats()
+                self.stdout.write(
+                    f"Inserted {inserted} submissions in {stats['last_drain_ms']:.0f}ms "
+                    f"({stats['skipped']} already in the database, {stats['backlog_bytes']} bytes left)."
+                )
+            if options['once']:
+                return
+            time.sleep(interval)
@@ -0,0 +1,73 @@
+import csv
+import json
+import sys
+import time
+
+from django.core.management.base import BaseCommand
+
+from EventApp.admin import spreadsheet_safe
+from EventApp.models import OrganizerEvent
+
+# (output column, lookup)
+COLUMNS = [
+    ('event_id', 'id'),
+    ('selected_at', 'selected_at'),
+    ('organizer_email', 'organizer__email'),
+    ('legacy_organizer_email', 'legacy_organizer_email'),
+    ('participation_id', 'participation_id'),
+    ('participant_name', 'participation__name'),
+    ('participant_email', 'participation__email'),
+    ('idea_title', 'participation__idea_title'),
+    ('category', 'participation__category'),
+    ('budget_estimate', 'participation__budget_estimate'),
+    ('preferred_date', 'participation__preferred_date'),
+    ('location', 'participation__location'),
+    ('venue', 'participation__venue'),
+    ('catering_type', 'participation__catering_type'),
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Stream selected events (OrganizerEvent) to CSV or JSONL with constant "
+        "memory, e.g. for venues."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', '-o', default='-', help="Output file (default: stdout).")
+        parser.add_argument('--format', choices=['csv', 'jsonl'], default='csv')
+        parser.add_argument('--since', help="Only events selected on or after this date (YYYY-MM-DD).")
+        parser.add_argument('--chunk-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        events = OrganizerEvent.objects.order_by('id')
+        if options['since']:
+            events = events.filter(selected_at__date__gte=options['since'])
+        names = [name for name, _ in COLUMNS]
+        rows = events.values_list(*[lookup for _, lookup in COLUMNS]).iterator(
+            chunk_size=options['chunk_size']
+        )
+
+        out = sys.stdout if options['output'] == '-' else open(options['output'], 'w', newline='', encoding='utf-8')
+        started = time.perf_counter()
+        count = 0
+        try:
+            if options['format'] == 'csv':
+                writer = csv.writer(out)
+                writer.writerow(names)
+                write = lambda row: writer.writerow(spreadsheet_safe(row))
+            else:
+                write = lambda row: out.write(json.dumps(dict(zip(names, row)), default=str) + '\n')
+            for row in rows:
+                write(row)
+                count += 1
+                if count % 100_000 == 0:
+                    self.stderr.write(f"  {count} rows ({count / (time.perf_counter() - started):.0f} rows/s)")
+        finally:
+            if out is not sys.stdout:
+                out.close()
+
+        elapsed = time.perf_counter() - started
+        self.stderr.write(self.style.SUCCESS(
+            f"Exported {count} events in {elapsed:.1f}s ({count / elapsed if elapsed else 0:.0f} rows/s)"
+        ))
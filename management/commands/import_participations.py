@@ -0,0 +1,119 @@
+import csv
+import json
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.http import QueryDict
+
+from EventApp.facets import count_added
+from EventApp.forms import ParticipationForm
+from EventApp.models import CateringSelection, Participation
+
+# multi-value columns; in CSV the items are separated by "|"
+LIST_FIELDS = ('snack_items', 'fullmeal_items')
+
+
+class Command(BaseCommand):
+    help = (
+        "Stream-import participations from a CSV or JSONL file (or - for stdin). "
+        "Every row is validated with ParticipationForm and valid rows are inserted "
+        "with bulk_create in batches."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="CSV/JSONL file, or - to read stdin.")
+        parser.add_argument('--format', choices=['csv', 'jsonl'],
+                            help="Input format (default: from the file extension).")
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--max-errors', type=int, default=100,
+                            help="Abort after this many invalid rows (0 = never).")
+        parser.add_argument('--dry-run', action='store_true', help="Validate only, insert nothing.")
+
+    def handle(self, *args, **options):
+        path = options['path']
+        fmt = options['format'] or ('jsonl' if path.endswith(('.jsonl', '.json')) else 'csv')
+        stream = sys.stdin if path == '-' else open(path, newline='', encoding='utf-8')
+
+        self.imported = self.invalid = 0
+        self.started = time.perf_counter()
+        batch = []
+        form = ParticipationForm()
+        try:
+            rows = self._read_csv(stream) if fmt == 'csv' else self._read_jsonl(stream)
+            for line_no, row, error in rows:
+                if error is None:
+                    form.rebind(self._form_data(row))
+                    if not form.is_valid():
+                        error = form.errors.as_json()
+                if error is not None:
+                    self.invalid += 1
+                    self.stderr.write(f"line {line_no}: {error}")
+                    if options['max_errors'] and self.invalid >= options['max_errors']:
+                        raise CommandError(f"Aborting after {self.invalid} invalid rows.")
+                    continue
+                batch.append((form.save(commit=False), form.cleaned_data['catering_items']))
+                if len(batch) >= options['batch_size']:
+                    self._flush(batch, options['dry_run'])
+                    batch = []
+            self._flush(batch, options['dry_run'])
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+
+        elapsed = time.perf_counter() - self.started
+        self.stdout.write(self.style.SUCCESS(
+            f"{'Validated' if options['dry_run'] else 'Imported'} {self.imported} rows, "
+            f"{self.invalid} invalid, in {elapsed:.1f}s ({self.imported / elapsed if elapsed else 0:.0f} rows/s)"
+        ))
+
+    # readers yield (line number, row, error); a row that can't be read is
+    # reported and counted like an invalid one
+    def _read_csv(self, stream):
+        for line_no, row in enumerate(csv.DictReader(stream), start=2):
+            yield line_no, row, None
+
+    def _read_jsonl(self, stream):
+        for line_no, line in enumerate(stream, start=1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError as exc:
+                yield line_no, None, f"not valid JSON ({exc})"
+                continue
+            if not isinstance(row, dict):
+                yield line_no, None, "not a JSON object"
+                continue
+            yield line_no, row, None
+
+    def _form_data(self, row):
+        data = QueryDict(mutable=True)
+        for key, value in row.items():
+            if value is None:
+                continue
+            if key in LIST_FIELDS:
+                items = value if isinstance(value, list) else [v for v in value.split('|') if v]
+                data.setlist(key, [str(item).strip() for item in items])
+            elif isinstance(value, bool):
+                data[key] = 'on' if value else ''
+            else:
+                data[key] = str(value)
+        return data
+
+    def _flush(self, batch, dry_run):
+        if not batch:
+            return
+        if not dry_run:
+            with transaction.atomic():
+                created = Participation.objects.bulk_create([instance for instance, _ in batch])
+                CateringSelection.objects.bulk_create([
+                    CateringSelection(participation=instance, item=item)
+                    for instance, (_, items) in zip(created, batch)
+                    for item in items
+                ])
+                count_added(created)
+        self.imported += len(batch)
+        elapsed = time.perf_counter() - self.started
+        self.stderr.write(f"  {self.imported} rows ({self.imported / elapsed:.0f} rows/s)")
@@ -0,0 +1,117 @@
+import datetime
+import statistics
+import threading
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connection, transaction
+from django.utils import timezone
+
+from EventApp.facets import count_added, count_removed
+from EventApp.models import LoginHistory, Participation, UserAccount
+from EventApp.selection import select_participations
+
+LOADTEST_DOMAIN = 'loadtest.invalid'
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure write throughput of the configured database: worker threads "
+        "mix submissions, organizer selections and logins like concurrent "
+        "requests do. Run once per DB_ENGINE to compare backends."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=8, help="Concurrent writers (server threads).")
+        parser.add_argument('--seconds', type=float, default=10.0)
+        parser.add_argument('--keep', action='store_true', help="Keep the rows written by the test.")
+
+    def handle(self, *args, **options):
+        settings_dict = connection.settings_dict
+        self.stdout.write(
+            f"{connection.vendor} {settings_dict['NAME']}  threads={options['threads']}  "
+            f"CONN_MAX_AGE={settings_dict['CONN_MAX_AGE']}"
+        )
+        if connection.vendor == 'sqlite':
+            with connection.cursor() as cursor:
+                cursor.execute('PRAGMA journal_mode')
+                self.stdout.write(f"journal_mode={cursor.fetchone()[0]}")
+
+        self.organizer, _ = UserAccount.objects.get_or_create(
+            email=f'organizer@{LOADTEST_DOMAIN}', defaults={'role': 'organizer'}
+        )
+        self.latencies, self.errors = [], []
+        self.lock = threading.Lock()
+        deadline = time.perf_counter() + options['seconds']
+        workers = [
+            threading.Thread(target=self._worker, args=(n, deadline))
+            for n in range(options['threads'])
+        ]
+        started = time.perf_counter()
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        elapsed = time.perf_counter() - started
+
+        latencies = sorted(self.latencies)
+        if latencies:
+            p50 = statistics.median(latencies)
+            p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+            self.stdout.write(self.style.SUCCESS(
+                f"{len(latencies) / elapsed:.0f} writes/s  ({len(latencies)} in {elapsed:.1f}s)  "
+                f"p50={p50:.1f}ms  p99={p99:.1f}ms  errors={len(self.errors)}"
+            ))
+        for error in sorted(set(self.errors))[:5]:
+            self.stderr.write(f"  {error}")
+
+        if not options['keep']:
+            written = Participation.objects.filter(email__endswith='@' + LOADTEST_DOMAIN)
+            with transaction.atomic():
+                count_removed(written.filter(selected_event__isnull=True))
+                written.delete()
+            UserAccount.objects.filter(email__endswith='@' + LOADTEST_DOMAIN).delete()
+
+    def _worker(self, n, deadline):
+        user = UserAccount.objects.get_or_create(
+            email=f'user{n}@{LOADTEST_DOMAIN}', defaults={'role': 'participant'}
+        )[0]
+        i = 0
+        try:
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                try:
+                    self._write(user, n, i)
+                except Exception as exc:
+                    with self.lock:
+                        self.errors.append(f"{type(exc).__name__}: {exc}")
+                else:
+                    with self.lock:
+                        self.latencies.append((time.perf_counter() - started) * 1000)
+                i += 1
+        finally:
+            close_old_connections()
+            connection.close()
+
+    def _write(self, user, n, i):
+        kind = i % 3
+        if kind == 0:  # views.participate
+            participation = Participation.objects.create(
+                name=f'Load {n}', email=f'user{n}@{LOADTEST_DOMAIN}', idea_title=f'Load test {n}-{i}',
+                description='', category='workshop', budget_estimate=1000,
+                # a free venue/date each, so selections book instead of colliding
+                preferred_date=timezone.localdate() + datetime.timedelta(days=i), location='gec',
+                venue=f'Load venue {n}',
+            )
+            count_added([participation])
+        elif kind == 1:  # views.organizer POST
+            pending = list(
+                Participation.objects.filter(email=f'user{n}@{LOADTEST_DOMAIN}', selected_event__isnull=True)
+                .values_list('id', flat=True)[:1]
+            )
+            select_participations(pending, self.organizer.id)
+        else:  # views.login_view
+            with transaction.atomic():
+                user.last_login = timezone.now()
+                user.save(update_fields=['last_login'])
+                LoginHistory.objects.create(user=user, email=user.email)
@@ -0,0 +1,69 @@
+import urllib.request
+
+from django.conf import settings
+from django.contrib.sessions.backends.cached_db import SessionStore
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+
+from EventApp.models import UserAccount
+from EventApp.perf import parse_prometheus, perf_registry
+
+REPORT_EMAIL = 'perfreport@{role}.invalid'
+
+
+class Command(BaseCommand):
+    help = (
+        "Per-view latency, SQL and response size report. Reads a running "
+        "server's /metrics/ (--url), or requests the given --path pages "
+        "in-process first and reports on those."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', help="A server's metrics page, e.g. http://127.0.0.1:8000/metrics/.")
+        parser.add_argument('--path', action='append', default=[],
+                            help="Page to request in-process (repeatable), e.g. /events/.")
+        parser.add_argument('--role', default='participant', choices=['participant', 'organizer'],
+                            help="Log the in-process requests in with this role.")
+        parser.add_argument('--requests', type=int, default=20, help="Requests per --path.")
+
+    def handle(self, *args, **options):
+        if options['url']:
+            with urllib.request.urlopen(options['url'], timeout=10) as response:
+                views = parse_prometheus(response.read().decode())
+        elif options['path']:
+            if not settings.PERF_INSTRUMENTATION:
+                raise CommandError("PERF_INSTRUMENTATION is off.")
+            perf_registry.reset()
+            client = Client(HTTP_HOST='localhost')
+            client.cookies[settings.SESSION_COOKIE_NAME] = self._session(options['role'])
+            for path in options['path']:
+                for _ in range(options['requests']):
+                    client.get(path)
+            views = perf_registry.views
+        else:
+            raise CommandError("Give --url or at least one --path.")
+
+        self.stdout.write(
+            f"{'view':<32} {'reqs':>6} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+            f"{'queries':>8} {'p95 q':>6} {'db ms':>7} {'tpl ms':>7} {'KB':>7}"
+        )
+        by_time = sorted(views.items(), key=lambda item: -item[1]['request_duration_seconds'].sum)
+        for view, histograms in by_time:
+            wall = histograms['request_duration_seconds']
+            queries = histograms['db_queries']
+            self.stdout.write(
+                f"{view[:32]:<32} {wall.count:>6} {wall.quantile(0.5) * 1000:>8.1f} "
+                f"{wall.quantile(0.95) * 1000:>8.1f} {wall.quantile(0.99) * 1000:>8.1f} "
+                f"{queries.mean:>8.1f} {queries.quantile(0.95):>6.0f} "
+                f"{histograms['db_duration_seconds'].mean * 1000:>7.1f} "
+                f"{histograms['template_duration_seconds'].mean * 1000:>7.1f} "
+                f"{histograms['response_bytes'].mean / 1024:>7.1f}"
+            )
+
+    def _session(self, role):
+        user, _ = UserAccount.objects.get_or_create(email=REPORT_EMAIL.format(role=role), defaults={'role': role})
+        session = SessionStore()
+        session['user_id'] = user.id
+        session['role'] = role
+        session.save()
+        return session.session_key
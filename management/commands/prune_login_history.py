@@ -0,0 +1,46 @@
+import datetime
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from EventApp.admin import refresh_row_estimates
+from EventApp.loginhistory import roll_up_login_history
+from EventApp.models import LoginHistory
+
+
+class Command(BaseCommand):
+    help = (
+        "Roll LoginHistory rows older than the retention period up into "
+        "LoginDailySummary and delete them in small batches."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=None,
+                            help="Keep this many days of raw rows (default: LOGIN_HISTORY_RETENTION_DAYS).")
+        parser.add_argument('--batch-size', type=int, default=None,
+                            help="Rows per transaction (default: LOGIN_HISTORY_PRUNE_BATCH_SIZE).")
+        parser.add_argument('--pause', type=float, default=0.05,
+                            help="Seconds to sleep between batches so other writers get the lock.")
+        parser.add_argument('--dry-run', action='store_true', help="Only count the rows that would go.")
+
+    def handle(self, *args, **options):
+        days = options['days'] if options['days'] is not None else settings.LOGIN_HISTORY_RETENTION_DAYS
+        # whole days only, so a day is never split between raw rows and the rollup
+        first_kept_day = timezone.localdate() - datetime.timedelta(days=days)
+        cutoff = timezone.make_aware(datetime.datetime.combine(first_kept_day, datetime.time.min))
+
+        if options['dry_run']:
+            count = LoginHistory.objects.filter(login_time__lt=cutoff).count()
+            self.stdout.write(f"{count} login rows before {first_kept_day} would be rolled up.")
+            return
+
+        started = time.perf_counter()
+        removed = roll_up_login_history(cutoff, options['batch_size'], options['pause'])
+        # the admin's estimated counts read these; nothing else refreshes them on SQLite
+        refresh_row_estimates()
+        self.stdout.write(self.style.SUCCESS(
+            f"Rolled up and deleted {removed} login rows before {first_kept_day} "
+            f"in {time.perf_counter() - started:.1f}s."
+        ))
@@ -0,0 +1,19 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from EventApp.facets import rebuild
+
+
+class Command(BaseCommand):
+    help = (
+        "Recount the organizer queue's facet counters (FacetCount) from the "
+        "pending participations, e.g. after rows were changed outside the app."
+    )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        counters = rebuild()
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt {counters} facet counters in {time.perf_counter() - started:.1f}s."
+        ))
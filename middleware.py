@@ -0,0 +1,120 @@
+import time
+from typing import NamedTuple
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.core.cache import cache
+
+from .models import UserAccount
+
+
+class Account(NamedTuple):
+    id: int
+    email: str
+    role: str
+
+
+# ------------------------------
+# Session-cached identity
+# ------------------------------
+# The account's id/email/role live in the (cache-backed) session, stamped with
+# a per-user version kept in the cache.  As long as the stamps match, no query
+# is needed; invalidate_account() drops the cached version so every session of
+# that user is re-read from UserAccount on its next request.  That reaches
+# other server processes only through a shared cache (see CACHES in settings).
+
+def _version_key(user_id):
+    return f'account:{user_id}:version'
+
+
+def _current_version(user_id):
+    version = cache.get(_version_key(user_id))
+    if version is None:
+        cache.add(_version_key(user_id), time.time_ns(), timeout=None)
+        version = cache.get(_version_key(user_id))
+    return version
+
+
+def remember_account(request, user):
+    request.session['user_id'] = user.id
+    request.session['role'] = user.role
+    request.session['email'] = user.email
+    request.session['account_version'] = _current_version(user.id)
+    request.account = Account(user.id, user.email, user.role)
+
+
+async def _acurrent_version(user_id):
+    version = await cache.aget(_version_key(user_id))
+    if version is None:
+        await cache.aadd(_version_key(user_id), time.time_ns(), timeout=None)
+        version = await cache.aget(_version_key(user_id))
+    return version
+
+
+async def aremember_account(request, user):
+    await request.session.aset('user_id', user.id)
+    await request.session.aset('role', user.role)
+    await request.session.aset('email', user.email)
+    await request.session.aset('account_version', await _acurrent_version(user.id))
+    request.account = Account(user.id, user.email, user.role)
+
+
+def invalidate_account(user_id):
+    cache.delete(_version_key(user_id))
+
+
+class AccountMiddleware:
+    """Sets ``request.account`` (an Account, or None when not logged in)."""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        request.account = self._load(request)
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        # under ASGI: the same checks through the async session/cache/ORM APIs
+        request.account = await self._aload(request)
+        return await self.get_response(request)
+
+    def _load(self, request):
+        session = request.session
+        user_id = session.get('user_id')
+        if user_id is None:
+            return None
+
+        version = cache.get(_version_key(user_id))
+        if version is not None and version == session.get('account_version'):
+            return Account(user_id, session['email'], session['role'])
+
+        # stale, invalidated or pre-middleware session: re-read the account once
+        user = UserAccount.objects.only('id', 'email', 'role').filter(pk=user_id).first()
+        if user is None:
+            session.flush()
+            return None
+        remember_account(request, user)
+        return request.account
+
+    async def _aload(self, request):
+        session = request.session
+        user_id = await session.aget('user_id')
+        if user_id is None:
+            return None
+
+        version = await cache.aget(_version_key(user_id))
+        if version is not None and version == session.get('account_version'):
+            return Account(user_id, session['email'], session['role'])
+
+        user = await UserAccount.objects.only('id', 'email', 'role').filter(pk=user_id).afirst()
+        if user is None:
+            await session.aflush()
+            return None
+        await aremember_account(request, user)
+        return request.account
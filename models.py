@@ -1,6 +1,8 @@
 from django.db import models
 from django.utils import timezone
 
+from .uploads import content_addressed_storage
+
 CATEGORY_CHOICES = [
     ('none', 'None'),
     ('wedding', 'Marriage / Wedding'),
@@ -94,6 +96,32 @@ LOCATION_CHOICES = [
     ('new_market', 'New Market'),
 ]
 
+class Venue(models.Model):
+    """A bookable venue at one of the LOCATION_CHOICES (see venues.venue_catalog)."""
+    location = models.CharField(max_length=100, choices=LOCATION_CHOICES[1:])
+    name = models.CharField(max_length=100)
+    capacity = models.PositiveIntegerField(blank=True, null=True, help_text="Guests")
+    is_active = models.BooleanField(default=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['location', 'name'], name='venue_location_name_unique'),
+        ]
+
+    def __str__(self):
+        return f"{self.name} ({self.get_location_display()})"
+
+
+class ParticipationQuerySet(models.QuerySet):
+    def budget_between(self, low, high):
+        return self.filter(budget_estimate__gte=low, budget_estimate__lte=high)
+
+    def serving(self, *items):
+        """Participations whose catering includes any of ``items`` (item keys)."""
+        # IN (subquery) lets the database drive the lookup from catering_item_idx
+        return self.filter(pk__in=CateringSelection.objects.filter(item__in=items).values('participation_id'))
+
+
 # For future dynamic venue expansion
 # Each location will have multiple venue names
 class Participation(models.Model):
@@ -102,24 +130,124 @@ class Participation(models.Model):
     idea_title = models.CharField(max_length=200)
     description = models.TextField()
     category = models.CharField(max_length=100)
-    budget_estimate = models.CharField(max_length=50)
+    budget_estimate = models.PositiveIntegerField()
     preferred_date = models.DateField()
     catering_type = models.CharField(max_length=50, blank=True, null=True)
-    snack_items = models.TextField(blank=True, null=True)
-    fullmeal_items = models.TextField(blank=True, null=True)
+    # chosen snack / full meal items live in CateringSelection rows
     location = models.CharField(max_length=100)
     venue = models.CharField(max_length=100)
-    file = models.FileField(upload_to="participation_files/", blank=True, null=True)
+    file = models.FileField(upload_to="participation_files/", storage=content_addressed_storage, blank=True, null=True)
     consent = models.BooleanField(default=False)
 
     # ===== New fields for organizer selection =====
     selected_event = models.CharField(max_length=100, blank=True, null=True)
     date_selected = models.DateTimeField(blank=True, null=True)
 
+    # receipt id of a write-behind submission (journal.py); makes replays idempotent
+    receipt = models.CharField(max_length=32, blank=True, null=True, editable=False)
+
+    class Meta:
+        indexes = [
+            # organizer queue: newest pending submissions first
+            models.Index(
+                fields=['-id'],
+                condition=models.Q(selected_event__isnull=True),
+                name='participation_pending_idx',
+            ),
+            # admin list_filter: category (alone or with a date range), preferred_date
+            models.Index(fields=['category', 'preferred_date'], name='participation_cat_date_idx'),
+            models.Index(fields=['preferred_date'], name='participation_date_idx'),
+            models.Index(fields=['budget_estimate'], name='participation_budget_idx'),
+        ]
+        constraints = [
+            # partial, so only journaled rows are indexed (and SQLite adds it
+            # without rebuilding the table and its full-text triggers)
+            models.UniqueConstraint(
+                fields=['receipt'],
+                condition=models.Q(receipt__isnull=False),
+                name='participation_receipt_unique',
+            ),
+        ]
+
+    objects = ParticipationQuerySet.as_manager()
+
     def __str__(self):
         return f"{self.idea_title} - {self.name}"
+
+
+class CateringSelection(models.Model):
+    """One catering item (a SNACK_ITEMS / FULL_MEAL_ITEMS key) chosen for a participation."""
+    participation = models.ForeignKey(
+        Participation, on_delete=models.CASCADE, related_name='catering_selections',
+        db_index=False,  # covered by catering_selection_unique (participation, item)
+    )
+    item = models.CharField(max_length=50)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['participation', 'item'], name='catering_selection_unique'),
+        ]
+        indexes = [
+            # "which participations serve X": item first, participation from the index
+            models.Index(fields=['item', 'participation'], name='catering_item_idx'),
+        ]
+
+    @staticmethod
+    def items_matching(term):
+        """Item keys whose key or label contains ``term``, e.g. 'biriyani'."""
+        term = term.lower()
+        return [
+            key for key, label in SNACK_ITEMS + FULL_MEAL_ITEMS
+            if term in key or term in label.lower()
+        ]
+
+    def __str__(self):
+        return f"{self.participation_id}: {self.item}"
+
+
+class VenueBooking(models.Model):
+    """
+    A venue taken on a date by a selected participation.
+
+    The unique (location, venue, date) constraint is the availability index:
+    at most one booking per venue and day, and both "is it free?" and the
+    calendar are lookups on it.
+    """
+    participation = models.OneToOneField(Participation, on_delete=models.CASCADE, related_name='venue_booking')
+    location = models.CharField(max_length=100)
+    venue = models.CharField(max_length=100)
+    date = models.DateField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['location', 'venue', 'date'], name='venue_booking_unique'),
+        ]
+
+    @classmethod
+    def slot(cls, location, venue, date):
+        return cls.objects.filter(location=location, venue=venue, date=date)
+
+    def __str__(self):
+        return f"{self.venue} on {self.date}"
+
+
+class FacetCount(models.Model):
+    """Pending participations per value of an organizer filter (kept up to date by facets.py)."""
+    facet = models.CharField(max_length=20)
+    value = models.CharField(max_length=100)
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['facet', 'value'], name='facetcount_facet_value'),
+        ]
+
+    def __str__(self):
+        return f"{self.facet}={self.value}: {self.count}"
 from django.db import models
-from django.contrib.auth.hashers import make_password, check_password
+from django.contrib.auth.hashers import make_password
+
+from .hashers import verify_password
 
 # ------------------------------
 # Custom User Model
@@ -136,11 +264,22 @@ class UserAccount(models.Model):
     last_login = models.DateTimeField(null=True, blank=True)
     is_logged_in = models.BooleanField(default=False)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['role'], name='useraccount_role_idx'),  # admin list_filter
+        ]
+
     def set_password(self, raw_password):
         self.password = make_password(raw_password)
 
     def check_password(self, raw_password):
-        return check_password(raw_password, self.password)
+        is_correct, new_password = verify_password(raw_password, self.password)
+        if is_correct and new_password:
+            # stored hash used an old algorithm/cost: upgrade it transparently
+            self.password = new_password
+            if self.pk:
+                self.save(update_fields=['password'])
+        return is_correct
 
     def __str__(self):
         return self.email
@@ -151,18 +290,67 @@ class UserAccount(models.Model):
 # models.py
 
 class OrganizerEvent(models.Model):
-    organizer_email = models.EmailField(default='unknown@example.com')  # ✅ default add
-    participant_name = models.CharField(max_length=100, default='Unknown')
-    participant_email = models.EmailField(default='unknown@example.com')
-    category = models.CharField(max_length=50, default='none')
-    idea_title = models.CharField(max_length=200, default='Untitled Idea')
-    budget_estimate = models.DecimalField(max_digits=10, decimal_places=2, default=0.0)
-    preferred_date = models.DateField(default='2026-01-01')
-    location = models.CharField(max_length=100, default='Unknown')
-    venue = models.CharField(max_length=100, default='Unknown')
-    file = models.FileField(upload_to='organizer_files/', blank=True, null=True)
+    # the selected submission itself; its details are not copied here
+    participation = models.OneToOneField(
+        Participation, on_delete=models.CASCADE, related_name='organizer_event'
+    )
+    organizer = models.ForeignKey(
+        UserAccount, on_delete=models.SET_NULL, null=True, blank=True, related_name='organized_events'
+    )
+    # selections made before organizers were linked, by someone with no account
+    legacy_organizer_email = models.EmailField(null=True, blank=True)
     selected_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # participant feed: newest selections first
+            models.Index(fields=['-selected_at'], name='organizerevent_selected_idx'),
+            # an organizer's own events, newest first
+            models.Index(fields=['organizer', '-selected_at'], name='orgevent_organizer_idx'),
+        ]
+
+    # read-through accessors for the fields this model used to copy
+    # (use select_related('participation', 'organizer') when listing)
+    @property
+    def organizer_email(self):
+        return self.organizer.email if self.organizer_id else self.legacy_organizer_email or ''
+
+    @property
+    def participant_name(self):
+        return self.participation.name
+
+    @property
+    def participant_email(self):
+        return self.participation.email
+
+    @property
+    def idea_title(self):
+        return self.participation.idea_title
+
+    @property
+    def category(self):
+        return self.participation.category
+
+    @property
+    def budget_estimate(self):
+        return self.participation.budget_estimate
+
+    @property
+    def preferred_date(self):
+        return self.participation.preferred_date
+
+    @property
+    def location(self):
+        return self.participation.location
+
+    @property
+    def venue(self):
+        return self.participation.venue
+
+    @property
+    def file(self):
+        return self.participation.file
+
     def __str__(self):
         return f"{self.participant_name} - {self.idea_title}"
 
@@ -176,7 +364,39 @@ from .models import UserAccount
 class LoginHistory(models.Model):
     user = models.ForeignKey(UserAccount, on_delete=models.CASCADE)
     email = models.EmailField()
-    login_time = models.DateTimeField(auto_now_add=True)  # automatically current time
+    # set when the login happens, not when the batched insert runs
+    login_time = models.DateTimeField(default=timezone.now, editable=False)
+
+    class Meta:
+        indexes = [
+            # admin list_filter / date ranges on login_time
+            models.Index(fields=['login_time'], name='loginhistory_time_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.email} logged in at {self.login_time}"
+
+
+class LoginDailySummary(models.Model):
+    """Logins per user per day, kept after the raw LoginHistory rows are pruned."""
+    user = models.ForeignKey(
+        UserAccount, on_delete=models.CASCADE,
+        db_index=False,  # covered by logindailysummary_user_day (user, day)
+    )
+    email = models.EmailField()
+    day = models.DateField()
+    login_count = models.PositiveIntegerField(default=0)
+    first_login = models.DateTimeField()
+    last_login = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'day'], name='logindailysummary_user_day'),
+        ]
+        indexes = [
+            models.Index(fields=['day'], name='logindailysummary_day_idx'),
+        ]
+        verbose_name_plural = 'login daily summaries'
 
     def __str__(self):
-        return f"{self.email} logged in at {self.login_time}"
\ No newline at end of file
+        return f"{self.email}: {self.login_count} logins on {self.day}"
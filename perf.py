@@ -0,0 +1,307 @@
+import bisect
+import contextvars
+import re
+import threading
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.template.backends.django import DjangoTemplates
+
+from .journal import submission_journal
+from .loginhistory import login_history_writer
+from .ratelimit import rate_limiter
+
+# (name, help, upper bounds of the buckets); times in seconds, sizes in bytes
+METRICS = [
+    ('request_duration_seconds', "Wall time of the request, middleware included.",
+     (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)),
+    ('db_queries', "SQL queries run by the request.",
+     (0, 1, 2, 3, 5, 10, 20, 50, 100, 500)),
+    ('db_duration_seconds', "Time spent in SQL queries.",
+     (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 5)),
+    ('template_duration_seconds', "Time spent rendering templates.",
+     (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1)),
+    ('response_bytes', "Size of the response body (streaming responses are not counted).",
+     (1_000, 10_000, 50_000, 100_000, 250_000, 500_000, 1_000_000, 5_000_000)),
+]
+PREFIX = 'eventapp_'
+
+
+class Histogram:
+    """Fixed-bucket histogram, like a Prometheus client's."""
+
+    def __init__(self, bounds):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)  # last one is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self):
+        total = 0
+        for count in self.counts:
+            total += count
+            yield total
+
+    def quantile(self, q):
+        """Estimate, interpolating inside the bucket (the upper bound for +Inf)."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, count in enumerate(self.counts):
+            if count and seen + count >= rank:
+                if i == len(self.bounds):
+                    return self.bounds[-1]
+                low = self.bounds[i - 1] if i else min(0, self.bounds[0])
+                return low + (self.bounds[i] - low) * (rank - seen) / count
+            seen += count
+        return self.bounds[-1]
+
+    @property
+    def mean(self):
+        return self.sum / self.count if self.count else 0.0
+
+
+class PerfRegistry:
+    """Per-view histograms of every METRICS entry, for this process."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.views = {}  # view name -> {metric name: Histogram}
+
+    def observe(self, view, values):
+        with self._lock:
+            histograms = self.views.get(view)
+            if histograms is None:
+                histograms = self.views[view] = {name: Histogram(bounds) for name, _, bounds in METRICS}
+            for name, value in values.items():
+                histograms[name].observe(value)
+
+    def reset(self):
+        with self._lock:
+            self.views = {}
+
+    def prometheus(self):
+        lines = []
+        with self._lock:
+            for name, help_text, bounds in METRICS:
+                lines += [f'# HELP {PREFIX}{name} {help_text}', f'# TYPE {PREFIX}{name} histogram']
+                for view, histograms in sorted(self.views.items()):
+                    histogram = histograms[name]
+                    labels = f'view="{_escape(view)}"'
+                    for bound, total in zip(bounds + ('+Inf',), histogram.cumulative()):
+                        lines.append(f'{PREFIX}{name}_bucket{{{labels},le="{bound}"}} {total}')
+                    lines.append(f'{PREFIX}{name}_sum{{{labels}}} {histogram.sum:g}')
+                    lines.append(f'{PREFIX}{name}_count{{{labels}}} {histogram.count}')
+        return lines
+
+
+perf_registry = PerfRegistry()
+
+
+def _family(name, kind, help_text, samples):
+    # samples: [(labels dict, value)]
+    lines = [f'# HELP {PREFIX}{name} {help_text}', f'# TYPE {PREFIX}{name} {kind}']
+    for labels, value in samples:
+        label_text = ','.join(f'{key}="{_escape(str(val))}"' for key, val in labels.items())
+        lines.append(f'{PREFIX}{name}{{{label_text}}} {value:g}' if label_text else f'{PREFIX}{name} {value:g}')
+    return lines
+
+
+def prometheus_text():
+    """The /metrics/ page: request histograms plus the background writers' and rate limiter's counters."""
+    lines = perf_registry.prometheus()
+
+    login = login_history_writer.stats()
+    lines += _family('login_history_queue_depth', 'gauge', "Login rows waiting to be written.",
+                     [({}, login['queue_depth'])])
+    lines += _family('login_history_written_total', 'counter', "Login rows written.", [({}, login['written'])])
+    lines += _family('login_history_failed_total', 'counter', "Login rows that could not be written.",
+                     [({}, login['failed'])])
+    lines += _family('login_history_flush_max_ms', 'gauge', "Slowest batch insert.", [({}, login['max_flush_ms'])])
+
+    limits = rate_limiter.stats()
+    lines += _family('ratelimit_allowed_total', 'counter', "Rate-limited POSTs let through.",
+                     [({'scope': scope}, count) for scope, count in sorted(limits['allowed'].items())])
+    lines += _family('ratelimit_rejected_total', 'counter', "POSTs answered with 429.", [
+        (dict(zip(('scope', 'key'), name.split(':'))), count)
+        for name, count in sorted(limits['rejected'].items())
+    ])
+
+    journal = submission_journal.stats()
+    lines += _family('submission_journal_backlog_bytes', 'gauge', "Journaled submissions not drained yet.",
+                     [({}, journal['backlog_bytes'])])
+    lines += _family('submission_journal_drained_total', 'counter', "Journaled submissions inserted.",
+                     [({}, journal['drained'])])
+    lines += _family('submission_journal_failed_drains_total', 'counter', "Drains that hit an error.",
+                     [({}, journal['failed_drains'])])
+    lines += _family('submission_journal_quarantined_total', 'counter', "Journal files set aside as *.failed.",
+                     [({}, journal['quarantined'])])
+    return '\n'.join(lines) + '\n'
+
+
+def _escape(value):
+    return value.replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n')
+
+
+_SAMPLE_LINE = re.compile(r'^(\w+?)(_bucket|_sum|_count)\{view="((?:[^"\\]|\\.)*)"(?:,le="([^"]+)")?\} (\S+)$')
+
+
+def parse_prometheus(text):
+    """PerfRegistry.views rebuilt from the histograms in a /metrics/ page."""
+    bounds = {PREFIX + name: bounds for name, _, bounds in METRICS}
+    views = {}
+    for line in text.splitlines():
+        match = _SAMPLE_LINE.match(line)
+        if not match or match[1] not in bounds:
+            continue
+        metric, kind, view, le, value = match.groups()
+        histogram = views.setdefault(view, {}).setdefault(metric[len(PREFIX):], Histogram(bounds[metric]))
+        if kind == '_sum':
+            histogram.sum = float(value)
+        elif kind == '_count':
+            histogram.count = int(float(value))
+        else:
+            # cumulative in the text; back to per-bucket counts
+            i = len(histogram.bounds) if le == '+Inf' else histogram.bounds.index(float(le))
+            histogram.counts[i] = int(float(value))
+    for histograms in views.values():
+        for histogram in histograms.values():
+            histogram.counts = [b - a for a, b in zip([0] + histogram.counts[:-1], histogram.counts)]
+    return views
+
+
+# ------------------------------
+# Per-request measurement
+# ------------------------------
+class _Sample:
+    __slots__ = ('queries', 'db_seconds', 'template_seconds')
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.template_seconds = 0.0
+
+
+# the request being measured; context variables follow sync_to_async into
+# the thread that runs the ORM for an async view
+_current_sample = contextvars.ContextVar('perf_sample', default=None)
+
+
+def _time_query(execute, sql, params, many, context):
+    # installed once on every connection (connections are per thread, so a
+    # per-request execute_wrapper would miss the async ORM's queries)
+    sample = _current_sample.get()
+    if sample is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        sample.db_seconds += time.perf_counter() - started
+        sample.queries += 1
+
+
+def _install(connection, **kwargs):
+    if _time_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_time_query)
+
+
+class PerfMiddleware:
+    """
+    Records wall time, SQL query count and time, template render time and
+    response size of every request into ``perf_registry``, by view name.
+
+    Put it first in MIDDLEWARE so the other middleware's time is included.
+    Turned off with ``PERF_INSTRUMENTATION = False``.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.PERF_INSTRUMENTATION:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+        # connections opened from now on, plus this thread's existing ones
+        connection_created.connect(_install, dispatch_uid='perf_time_query')
+        for connection in connections.all(initialized_only=True):
+            _install(connection)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        sample = _Sample()
+        token = _current_sample.set(sample)
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _current_sample.reset(token)
+        self._record(request, response, sample, time.perf_counter() - started)
+        return response
+
+    async def __acall__(self, request):
+        sample = _Sample()
+        token = _current_sample.set(sample)
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current_sample.reset(token)
+        self._record(request, response, sample, time.perf_counter() - started)
+        return response
+
+    def _record(self, request, response, sample, seconds):
+        match = request.resolver_match
+        values = {
+            'request_duration_seconds': seconds,
+            'db_queries': sample.queries,
+            'db_duration_seconds': sample.db_seconds,
+            'template_duration_seconds': sample.template_seconds,
+        }
+        if not response.streaming:
+            values['response_bytes'] = len(response.content)
+        perf_registry.observe(match.view_name if match else 'unresolved', values)
+
+
+# ------------------------------
+# Template render time
+# ------------------------------
+class _TimedTemplate:
+    def __init__(self, wrapped):
+        self._wrapped = wrapped
+
+    def __getattr__(self, name):
+        return getattr(self._wrapped, name)
+
+    def render(self, context=None, request=None):
+        sample = _current_sample.get()
+        if sample is None:
+            return self._wrapped.render(context, request)
+        started = time.perf_counter()
+        try:
+            return self._wrapped.render(context, request)
+        finally:
+            sample.template_seconds += time.perf_counter() - started
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """The Django template backend, timing each render for PerfMiddleware."""
+
+    def from_string(self, template_code):
+        return _TimedTemplate(super().from_string(template_code))
+
+    def get_template(self, template_name):
+        return _TimedTemplate(super().get_template(template_name))
@@ -0,0 +1,147 @@
+import hashlib
+import math
+import threading
+import time
+from collections import Counter
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse
+
+
+# ------------------------------
+# Token buckets in the cache
+# ------------------------------
+# RATELIMITS maps a scope (e.g. 'login') to buckets of (key, requests, seconds):
+# each client key ('ip' or 'email') gets ``requests`` tokens, refilled evenly
+# over ``seconds``, and every POST takes one from each bucket, only once all of
+# them have a token to give.  The bucket state is one cache entry (tokens,
+# timestamp).  The read-modify-write is not atomic across processes, so
+# concurrent requests may overdraw a bucket by a few tokens.
+
+class RateLimiter:
+    def __init__(self):
+        self._lock = threading.Lock()
+        # counters, see stats()
+        self.allowed = Counter()
+        self.rejected = Counter()  # (scope, key) -> requests turned away
+
+    @property
+    def cache(self):
+        return caches[settings.RATELIMIT_CACHE]
+
+    def _bucket_keys(self, scope, request):
+        for kind, requests, seconds in settings.RATELIMITS.get(scope, ()):
+            value = client_ip(request) if kind == 'ip' else request.POST.get(kind, '').strip().lower()
+            if value:
+                digest = hashlib.sha1(value.encode()).hexdigest()
+                yield kind, f'ratelimit:{scope}:{kind}:{digest}', requests, seconds
+
+    @staticmethod
+    def _take(state, requests, seconds, now):
+        """New bucket state and the seconds to wait (0 when a token was taken)."""
+        rate = requests / seconds
+        tokens, stamp = state or (requests, now)
+        tokens = min(requests, tokens + (now - stamp) * rate)
+        if tokens < 1:
+            return None, (1 - tokens) / rate
+        return (tokens - 1, now), 0
+
+    def _decide(self, scope, buckets, states, now):
+        """({key: (new state, timeout)}, 0) if every bucket has a token, else (None, seconds to wait)."""
+        taken = {}
+        for kind, key, requests, seconds in buckets:
+            state, wait = self._take(states.get(key), requests, seconds, now)
+            if wait:
+                # nothing is spent: a request turned away by one bucket
+                # doesn't drain the others
+                self.rejected[scope, kind] += 1
+                return None, wait
+            taken[key] = (state, math.ceil(seconds))
+        self.allowed[scope] += 1
+        return taken, 0
+
+    def check(self, scope, request):
+        """Take a token from each of ``scope``'s buckets; returns the seconds to wait, or 0."""
+        buckets = list(self._bucket_keys(scope, request))
+        with self._lock:
+            states = self.cache.get_many([key for _, key, _, _ in buckets])
+            taken, wait = self._decide(scope, buckets, states, time.time())
+            for key, (state, timeout) in (taken or {}).items():
+                self.cache.set(key, state, timeout=timeout)
+        return wait
+
+    async def acheck(self, scope, request):
+        """check() for async views."""
+        buckets = list(self._bucket_keys(scope, request))
+        states = await self.cache.aget_many([key for _, key, _, _ in buckets])
+        taken, wait = self._decide(scope, buckets, states, time.time())
+        for key, (state, timeout) in (taken or {}).items():
+            await self.cache.aset(key, state, timeout=timeout)
+        return wait
+
+    def stats(self):
+        return {
+            'allowed': dict(self.allowed),
+            'rejected': {f'{scope}:{kind}': count for (scope, kind), count in self.rejected.items()},
+        }
+
+
+rate_limiter = RateLimiter()
+
+
+def client_ip(request):
+    # RATELIMIT_IP_HEADER: e.g. HTTP_X_FORWARDED_FOR behind a trusted proxy.
+    # The client writes whatever it likes at the left of that header; only the
+    # address appended by our own proxies (RATELIMIT_TRUSTED_PROXIES of them,
+    # counted from the right) can be trusted.
+    value = request.META.get(settings.RATELIMIT_IP_HEADER)
+    if not value:
+        return request.META.get('REMOTE_ADDR', '')
+    hops = [hop.strip() for hop in value.split(',') if hop.strip()]
+    if not hops:
+        return request.META.get('REMOTE_ADDR', '')
+    return hops[-min(settings.RATELIMIT_TRUSTED_PROXIES, len(hops))]
+
+
+def too_many_requests(wait):
+    retry_after = max(1, math.ceil(wait))
+    response = HttpResponse(
+        f"Too many attempts. Try again in {retry_after} seconds.\n",
+        status=429, content_type='text/plain; charset=utf-8',
+    )
+    response['Retry-After'] = str(retry_after)
+    return response
+
+
+def rate_limited(scope):
+    """
+    Answer POSTs to ``view`` with 429 once a client runs out of tokens in
+    ``RATELIMITS[scope]``; checked before the view touches the database or
+    hashes a password.
+    """
+    def decorator(view):
+        def limited(request):
+            return request.method == 'POST' and settings.RATELIMIT_ENABLED
+
+        if iscoroutinefunction(view):
+            @wraps(view)
+            async def async_wrapper(request, *args, **kwargs):
+                if limited(request):
+                    wait = await rate_limiter.acheck(scope, request)
+                    if wait:
+                        return too_many_requests(wait)
+                return await view(request, *args, **kwargs)
+            return async_wrapper
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if limited(request):
+                wait = rate_limiter.check(scope, request)
+                if wait:
+                    return too_many_requests(wait)
+            return view(request, *args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,106 @@
+import contextvars
+from contextlib import contextmanager
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+REPLICA_ALIAS = 'replica'
+# set on a client after it writes; while present its reads stay on the primary
+PIN_COOKIE = 'read_primary'
+# reads of these may lag the primary by a moment; everything else (sessions,
+# accounts, ...) is always read from the primary
+REPLICA_MODELS = {'EventApp.OrganizerEvent', 'EventApp.Participation'}
+
+_reads_from = contextvars.ContextVar('reads_from', default=None)
+
+
+def replica_configured():
+    return REPLICA_ALIAS in settings.DATABASES
+
+
+class ReplicaRouter:
+    """
+    Sends reads of REPLICA_MODELS to the ``replica`` alias inside views marked
+    with ``replica_reads``; all writes, and all other reads, go to ``default``.
+    """
+
+    def db_for_read(self, model, **hints):
+        if _reads_from.get() == REPLICA_ALIAS and model._meta.label in REPLICA_MODELS:
+            return REPLICA_ALIAS
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        # also for instances loaded from the replica
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True  # same data on both aliases
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db != REPLICA_ALIAS
+
+
+@contextmanager
+def use_primary():
+    """Read everything from the primary inside this block."""
+    token = _reads_from.set(None)
+    try:
+        yield
+    finally:
+        _reads_from.reset(token)
+
+
+def replica_reads(view):
+    """
+    Serve the GET/HEAD reads of ``view`` from the replica, unless the client
+    wrote something in the last REPLICA_STICKY_SECONDS (see ``pin_primary``).
+    """
+    def use_replica(request):
+        return (request.method in ('GET', 'HEAD') and replica_configured()
+                and PIN_COOKIE not in request.COOKIES)
+
+    if iscoroutinefunction(view):
+        @wraps(view)
+        async def async_wrapper(request, *args, **kwargs):
+            if not use_replica(request):
+                return await view(request, *args, **kwargs)
+            token = _reads_from.set(REPLICA_ALIAS)
+            try:
+                return await view(request, *args, **kwargs)
+            finally:
+                _reads_from.reset(token)
+        return async_wrapper
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if not use_replica(request):
+            return view(request, *args, **kwargs)
+        token = _reads_from.set(REPLICA_ALIAS)
+        try:
+            return view(request, *args, **kwargs)
+        finally:
+            _reads_from.reset(token)
+    return wrapper
+
+
+def pin_primary(view):
+    """Keep the client on the primary for a short while after a POST (read-your-writes)."""
+    def pin(request, response):
+        if request.method == 'POST' and replica_configured():
+            response.set_cookie(
+                PIN_COOKIE, '1', max_age=settings.REPLICA_STICKY_SECONDS, httponly=True, samesite='Lax'
+            )
+        return response
+
+    if iscoroutinefunction(view):
+        @wraps(view)
+        async def async_wrapper(request, *args, **kwargs):
+            return pin(request, await view(request, *args, **kwargs))
+        return async_wrapper
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        return pin(request, view(request, *args, **kwargs))
+    return wrapper
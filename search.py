@@ -0,0 +1,121 @@
+import re
+
+from django.db import connections, router
+from django.db.models import BooleanField, Q
+from django.db.models.expressions import RawSQL
+
+from .models import Participation
+
+# Full-text index over Participation.idea_title / description, created by
+# migration 0017: an FTS5 table kept in sync by triggers on SQLite, a GIN
+# expression index on PostgreSQL.  Other backends fall back to LIKE.
+FTS_TABLE = 'participation_fts'
+PG_DOCUMENT = "to_tsvector('simple', coalesce(idea_title, '') || ' ' || coalesce(description, ''))"
+MAX_TERMS = 10
+RANK_WINDOW = 5000
+
+
+def _terms(text):
+    return re.findall(r'\w+', text.lower())[:MAX_TERMS]
+
+
+def _fts5_query(terms):
+    # every word as a quoted prefix ("beach"* "par"*): all must match, and
+    # nothing the user types is read as FTS5 syntax
+    return ' '.join(f'"{term}"*' for term in terms)
+
+
+def _pg_query(terms):
+    return ' & '.join(f'{term}:*' for term in terms)
+
+
+def _fts5_window_start(query, candidates, candidate_params):
+    # bm25 scores every match, so a common word would rank a large part of the
+    # table; only the newest RANK_WINDOW matching candidates are ranked (rowid
+    # order is free).  The candidate filter goes in here, not after, or matches
+    # outside it would use up the window.
+    table = Participation._meta.db_table
+    with _connection().cursor() as cursor:
+        cursor.execute(
+            f'SELECT {FTS_TABLE}.rowid FROM {FTS_TABLE} JOIN "{table}" p ON p.id = {FTS_TABLE}.rowid '
+            f'WHERE {FTS_TABLE} MATCH %s{candidates} ORDER BY {FTS_TABLE}.rowid DESC LIMIT 1 OFFSET %s',
+            [query, *candidate_params, RANK_WINDOW - 1],
+        )
+        row = cursor.fetchone()
+    return row[0] if row else 0
+
+
+def _connection():
+    return connections[router.db_for_read(Participation)]
+
+
+def _backend():
+    connection = _connection()
+    if connection.vendor == 'postgresql':
+        return 'postgresql'
+    if connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [FTS_TABLE])
+            if cursor.fetchone():
+                return 'fts5'
+    return None
+
+
+def matching(queryset, text):
+    """``queryset`` narrowed to rows whose title or description contains every word of ``text``."""
+    terms = _terms(text)
+    if not terms:
+        return queryset.none()
+    backend = _backend()
+    if backend == 'fts5':
+        return queryset.filter(id__in=RawSQL(
+            f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s", [_fts5_query(terms)]
+        ))
+    if backend == 'postgresql':
+        return queryset.filter(RawSQL(
+            f"{PG_DOCUMENT} @@ to_tsquery('simple', %s)", [_pg_query(terms)], output_field=BooleanField()
+        ))
+    for term in terms:
+        queryset = queryset.filter(Q(idea_title__icontains=term) | Q(description__icontains=term))
+    return queryset
+
+
+def ranked_ids(text, limit=50, queryset=None):
+    """
+    Ids of the ``limit`` best matches for ``text``, best first.
+
+    Title hits rank above description hits.  With ``queryset`` (e.g. the
+    organizer queue with its facet filters) only its rows are ranked.  On
+    SQLite only the newest RANK_WINDOW of those matches are ranked.
+    """
+    terms = _terms(text)
+    if not terms:
+        return []
+    table = Participation._meta.db_table
+    candidates, candidate_params = '', []
+    if queryset is not None:
+        subquery, candidate_params = queryset.order_by().values('id').query.sql_with_params()
+        candidates = f' AND p.id IN ({subquery})'
+    backend = _backend()
+    if backend == 'fts5':
+        query = _fts5_query(terms)
+        sql = (
+            f'SELECT p.id FROM {FTS_TABLE} JOIN "{table}" p ON p.id = {FTS_TABLE}.rowid '
+            f'WHERE {FTS_TABLE} MATCH %s AND {FTS_TABLE}.rowid >= %s{candidates} '
+            f'ORDER BY bm25({FTS_TABLE}, 10.0, 1.0) LIMIT %s'
+        )
+        params = [query, _fts5_window_start(query, candidates, candidate_params), *candidate_params, limit]
+    elif backend == 'postgresql':
+        sql = (
+            f'SELECT p.id FROM "{table}" p, to_tsquery(\'simple\', %s) q '
+            f'WHERE {PG_DOCUMENT} @@ q{candidates} '
+            f'ORDER BY ts_rank({PG_DOCUMENT}, q) DESC LIMIT %s'
+        )
+        params = [_pg_query(terms), *candidate_params, limit]
+    else:
+        queryset = matching(Participation.objects.all() if queryset is None else queryset, text)
+        return list(queryset.order_by('-id').values_list('id', flat=True)[:limit])
+
+    with _connection().cursor() as cursor:
+        cursor.execute(sql, params)
+        return [row[0] for row in cursor.fetchall()]
@@ -0,0 +1,77 @@
+from django.db import transaction
+from django.db.models.functions import Left
+from django.utils import timezone
+
+from .facets import FACET_COLUMNS, count_removed
+from .feed import invalidate_event_feed
+from .models import OrganizerEvent, Participation, VenueBooking
+
+
+def select_participations(participation_ids, organizer_id):
+    """
+    Claim pending participations for an organizer in one transaction.
+
+    Rows are claimed with a single conditional UPDATE (``selected_event IS NULL``),
+    stamped with this call's ``date_selected``, so two organizers selecting the same
+    card can never both win.  Each claimed row then books its venue for its
+    preferred date; rows whose venue is already booked that day are released
+    again.  Returns ``(selected, taken, unavailable)``: the claimed Participation
+    rows, the requested ids that were already selected or missing, and the rows
+    left unselected because their venue/date was taken.
+    """
+    ids = sorted({int(pk) for pk in participation_ids})
+    if not ids:
+        return [], [], []
+
+    with transaction.atomic():
+        claimed_at = timezone.now()
+        Participation.objects.filter(
+            id__in=ids, selected_event__isnull=True
+        ).update(
+            selected_event=Left('idea_title', 100),
+            date_selected=claimed_at,
+        )
+        selected = list(
+            Participation.objects
+            .filter(id__in=ids, date_selected=claimed_at)
+            .only('id', 'idea_title', 'venue', 'preferred_date', *FACET_COLUMNS)
+            .order_by('id')
+        )
+        unavailable = _book_venues(selected)
+        if unavailable:
+            selected = [p for p in selected if p not in unavailable]
+        # they leave the pending queue
+        count_removed(selected)
+
+        OrganizerEvent.objects.bulk_create([
+            OrganizerEvent(participation=p, organizer_id=organizer_id)
+            for p in selected
+        ])
+
+    if selected:
+        transaction.on_commit(invalidate_event_feed)
+
+    claimed_ids = {p.id for p in selected} | {p.id for p in unavailable}
+    taken = [pk for pk in ids if pk not in claimed_ids]
+    return selected, taken, unavailable
+
+
+def _book_venues(claimed):
+    """Book venue+date for ``claimed`` rows; release and return those whose slot is taken."""
+    bookable = [p for p in claimed if p.venue and p.preferred_date]
+    # the unique constraint decides, also against concurrent selections
+    VenueBooking.objects.bulk_create([
+        VenueBooking(participation=p, location=p.location, venue=p.venue, date=p.preferred_date)
+        for p in bookable
+    ], ignore_conflicts=True)
+    booked = set(
+        VenueBooking.objects
+        .filter(participation__in=bookable)
+        .values_list('participation_id', flat=True)
+    )
+    unavailable = [p for p in bookable if p.id not in booked]
+    if unavailable:
+        Participation.objects.filter(id__in=[p.id for p in unavailable]).update(
+            selected_event=None, date_selected=None,
+        )
+    return unavailable
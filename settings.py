@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -44,20 +45,29 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'EventApp.perf.PerfMiddleware',  # first, so it times the other middleware too
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'EventApp.middleware.AccountMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
 ROOT_URLCONF = 'EventManagement.urls'
 
+# Serve home / p_event / organizer / participate from their async versions
+# (views.*_async). Off by default, under ASGI too: bench_views measured the
+# async feed about 10x slower than the sync views, so turn it on only after
+# benchmarking your deployment.
+ASYNC_VIEWS = os.environ.get('ASYNC_VIEWS', '') == '1'
+
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        # DjangoTemplates, timing renders for perf.PerfMiddleware
+        'BACKEND': 'EventApp.perf.TimedDjangoTemplates',
         'DIRS': [],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -76,14 +86,163 @@ WSGI_APPLICATION = 'EventManagement.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+# DB_ENGINE=postgresql for a multi-process deployment; the default is the
+# single-node SQLite file, tuned for concurrent readers and one writer.
+DB_ENGINE = os.environ.get('DB_ENGINE', 'sqlite')
+
+if DB_ENGINE == 'postgresql':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.environ.get('DB_NAME', 'eventmanagement'),
+            'USER': os.environ.get('DB_USER', 'eventmanagement'),
+            'PASSWORD': os.environ.get('DB_PASSWORD', ''),
+            'HOST': os.environ.get('DB_HOST', 'localhost'),
+            'PORT': os.environ.get('DB_PORT', '5432'),
+            # keep connections between requests, and check them before reuse
+            'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', 60)),
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {},
+        }
+    }
+    if os.environ.get('DB_POOL', '') == '1':
+        # psycopg 3 connection pool (pip install "psycopg[pool]"); Django
+        # requires CONN_MAX_AGE = 0 when the pool manages connections
+        DATABASES['default']['CONN_MAX_AGE'] = 0
+        DATABASES['default']['OPTIONS']['pool'] = {
+            'min_size': int(os.environ.get('DB_POOL_MIN_SIZE', 2)),
+            'max_size': int(os.environ.get('DB_POOL_MAX_SIZE', 20)),
+            'timeout': 10,
+        }
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.environ.get('DB_NAME', BASE_DIR / 'db.sqlite3'),
+            'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', 60)),
+            'OPTIONS': {
+                # run on every new connection: WAL lets readers run alongside
+                # the writer; synchronous=NORMAL is durable in WAL mode except
+                # for the last commits on power loss
+                'init_command': (
+                    'PRAGMA journal_mode=WAL;'
+                    'PRAGMA synchronous=NORMAL;'
+                    'PRAGMA cache_size=-20000;'
+                    'PRAGMA temp_store=MEMORY;'
+                ),
+                # busy timeout (seconds) before "database is locked"
+                'timeout': 20,
+                # take the write lock at BEGIN, so a transaction never fails
+                # half way through upgrading from a read lock
+                'transaction_mode': 'IMMEDIATE',
+            },
+        }
+    }
+
+# Optional read replica: DB_REPLICA_HOST (PostgreSQL) or DB_REPLICA_NAME (a
+# replicated SQLite file, e.g. via Litestream/LiteFS).  Views marked with
+# routers.replica_reads read the feed and queue from it; a client that just
+# wrote keeps reading the primary for REPLICA_STICKY_SECONDS.
+if os.environ.get('DB_REPLICA_HOST') or os.environ.get('DB_REPLICA_NAME'):
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'HOST': os.environ.get('DB_REPLICA_HOST', DATABASES['default'].get('HOST', '')),
+        'NAME': os.environ.get('DB_REPLICA_NAME', DATABASES['default']['NAME']),
+        'TEST': {'MIRROR': 'default'},
+    }
+DATABASE_ROUTERS = ['EventApp.routers.ReplicaRouter']
+REPLICA_STICKY_SECONDS = 5
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+
+# The event feed, the venue catalog and the identities cached in sessions are
+# invalidated by bumping version keys in the default cache, and the rate limiter
+# keeps its buckets there, so every server process must share it: set REDIS_URL
+# whenever more than one process serves requests.  LocMemCache is per process
+# (fine for runserver and tests); `check --deploy` warns about it.
+if os.environ.get('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ['REDIS_URL'],
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'eventapp',
+        }
     }
+
+# Sessions are read from the cache and only fall back to the database on a miss
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+
+# Participant event feed (views.p_event)
+EVENT_FEED_PAGE_SIZE = 24
+EVENT_FEED_CACHE_TIMEOUT = 300  # seconds; pages are also invalidated on selection
+
+
+# Login history (loginhistory.LoginHistoryWriter)
+# Rows are buffered and written in batches by a background thread.
+LOGIN_HISTORY_ASYNC = True
+LOGIN_HISTORY_BATCH_SIZE = 100
+LOGIN_HISTORY_FLUSH_INTERVAL_MS = 250
+# Raw rows older than this many days are rolled up into LoginDailySummary and
+# deleted by `manage.py prune_login_history` (run it daily, e.g. from cron).
+LOGIN_HISTORY_RETENTION_DAYS = int(os.environ.get('LOGIN_HISTORY_RETENTION_DAYS', 90))
+LOGIN_HISTORY_PRUNE_BATCH_SIZE = 500
+
+
+# Rate limiting (ratelimit.rate_limited on login_view, register, participate)
+# Token buckets per client: (key, requests, seconds) allows `requests` POSTs
+# per `seconds`, refilled evenly; the key is the client IP or a POSTed field.
+RATELIMIT_ENABLED = os.environ.get('RATELIMIT_ENABLED', '1') == '1'
+RATELIMIT_CACHE = 'default'  # use a shared cache (e.g. Redis) with several processes
+RATELIMIT_IP_HEADER = os.environ.get('RATELIMIT_IP_HEADER', 'REMOTE_ADDR')
+# proxies in front of the app that append to RATELIMIT_IP_HEADER; the client
+# address is the entry this many places from the right
+RATELIMIT_TRUSTED_PROXIES = int(os.environ.get('RATELIMIT_TRUSTED_PROXIES', 1))
+RATELIMITS = {
+    'login': [('ip', 30, 60), ('email', 10, 300)],
+    'register': [('ip', 10, 3600)],
+    'participate': [('ip', 30, 60), ('email', 20, 3600)],
 }
 
 
+# Request instrumentation (perf.PerfMiddleware)
+# Per-view histograms of wall time, SQL queries/time, template time and
+# response size, served at /metrics/ (Prometheus text format) to these
+# addresses; `manage.py perfreport` summarises them.
+PERF_INSTRUMENTATION = os.environ.get('PERF_INSTRUMENTATION', '1') == '1'
+PERF_METRICS_ALLOWED_IPS = os.environ.get('PERF_METRICS_ALLOWED_IPS', '127.0.0.1,::1').split(',')
+
+
+# Write-behind submissions (journal.SubmissionJournal)
+# With SUBMISSION_WRITE_BEHIND=1, participate appends validated submissions to
+# an fsync'd local journal and answers with a receipt id; the journal is
+# drained into the database with bulk_create by a background thread in each
+# process and/or by `manage.py drain_submissions`.  Journal files left by a
+# crash or restart are replayed when the app starts (background drainer) or by
+# the next drain_submissions run; files with records that cannot be inserted
+# are set aside as *.failed (see drain_submissions --retry-failed).
+SUBMISSION_WRITE_BEHIND = os.environ.get('SUBMISSION_WRITE_BEHIND', '') == '1'
+SUBMISSION_JOURNAL_DIR = os.environ.get('SUBMISSION_JOURNAL_DIR', BASE_DIR / 'journal')
+SUBMISSION_DRAIN_IN_BACKGROUND = True
+SUBMISSION_DRAIN_BATCH_SIZE = 500
+SUBMISSION_DRAIN_INTERVAL_MS = 500
+
+
+# File uploads
+# Files are streamed to disk and hashed as they arrive (uploads.HashingUploadHandler)
+# and stored once per distinct content (uploads.ContentAddressedStorage).
+FILE_UPLOAD_HANDLERS = ['EventApp.uploads.HashingUploadHandler']
+UPLOAD_MAX_FILE_BYTES = 10 * 1024 * 1024
+UPLOAD_MAX_REQUEST_BYTES = UPLOAD_MAX_FILE_BYTES + 1024 * 1024  # room for the form fields
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -103,6 +262,31 @@ AUTH_PASSWORD_VALIDATORS = [
 ]
 
 
+# Password hashing
+# Pick the algorithm and its cost per deployment. Hashes made with another
+# algorithm or cost still verify and are upgraded on the user's next login.
+
+PASSWORD_HASH_ALGORITHM = os.environ.get('PASSWORD_HASH_ALGORITHM', 'pbkdf2')
+PASSWORD_HASH_PBKDF2_ITERATIONS = int(os.environ.get('PASSWORD_HASH_PBKDF2_ITERATIONS', 1_000_000))
+PASSWORD_HASH_SCRYPT_WORK_FACTOR = int(os.environ.get('PASSWORD_HASH_SCRYPT_WORK_FACTOR', 2**14))
+PASSWORD_HASH_ARGON2_TIME_COST = int(os.environ.get('PASSWORD_HASH_ARGON2_TIME_COST', 2))
+PASSWORD_HASH_ARGON2_MEMORY_COST = int(os.environ.get('PASSWORD_HASH_ARGON2_MEMORY_COST', 102400))  # KiB
+
+# Run password verification in a bounded thread pool (hashers.verify_password)
+PASSWORD_HASH_OFFLOAD = os.environ.get('PASSWORD_HASH_OFFLOAD', '') == '1'
+PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', 4))
+
+PASSWORD_HASH_ALGORITHMS = {
+    'pbkdf2': 'EventApp.hashers.TunablePBKDF2PasswordHasher',
+    'scrypt': 'EventApp.hashers.TunableScryptPasswordHasher',
+    'argon2': 'EventApp.hashers.TunableArgon2PasswordHasher',
+}
+# the first entry hashes new passwords; the rest only verify old ones
+PASSWORD_HASHERS = [PASSWORD_HASH_ALGORITHMS[PASSWORD_HASH_ALGORITHM]] + [
+    hasher for name, hasher in PASSWORD_HASH_ALGORITHMS.items() if name != PASSWORD_HASH_ALGORITHM
+]
+
+
 # Internationalization
 # https://docs.djangoproject.com/en/5.2/topics/i18n/
 
@@ -120,6 +304,11 @@ USE_TZ = True
 
 STATIC_URL = 'static/'
 
+# Responsive variants of the event artwork, built by `manage.py build_event_images`
+# and emitted by the {% responsive_image %} tag (templatetags/eventimages.py)
+EVENT_IMAGE_WIDTHS = [320, 480, 640, 960]
+EVENT_IMAGE_FORMATS = ['avif', 'webp']  # in order of preference
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -0,0 +1,68 @@
+import json
+from functools import lru_cache
+from pathlib import Path
+
+from django import template
+from django.apps import apps
+from django.conf import settings
+from django.templatetags.static import static
+from django.utils.html import format_html, format_html_join
+
+register = template.Library()
+
+MIME_TYPES = {'avif': 'image/avif', 'webp': 'image/webp'}
+DEFAULT_SIZES = "(max-width: 576px) 100vw, (max-width: 992px) 50vw, 420px"
+
+
+def _manifest_path():
+    return (Path(apps.get_app_config('EventApp').path)
+            / 'static' / 'EventApp' / 'eventpics' / 'variants' / 'manifest.json')
+
+
+@lru_cache(maxsize=1)
+def _load_manifest(mtime):
+    return json.loads(_manifest_path().read_text())
+
+
+def get_manifest():
+    try:
+        mtime = _manifest_path().stat().st_mtime
+    except FileNotFoundError:
+        return {}
+    return _load_manifest(mtime)
+
+
+def _preference(item):
+    formats = settings.EVENT_IMAGE_FORMATS
+    return formats.index(item[0]) if item[0] in formats else len(formats)
+
+
+@register.simple_tag
+def responsive_image(path, alt='', sizes=DEFAULT_SIZES, **attrs):
+    """
+    Render ``path`` (a static path) as a <picture> with AVIF/WebP srcsets.
+
+    Falls back to a plain <img> of the original file when build_event_images
+    hasn't produced variants for it.
+    """
+    attrs.setdefault('loading', 'lazy')
+    attrs.setdefault('decoding', 'async')
+    entry = get_manifest().get(path)
+
+    img_attrs = {'src': static(path), 'alt': alt, **attrs}
+    if entry:
+        img_attrs.update(width=entry['width'], height=entry['height'])
+    img = format_html('<img{}>', format_html_join('', ' {}="{}"', img_attrs.items()))
+    if not entry:
+        return img
+
+    sources = format_html_join(
+        '', '<source type="{}" srcset="{}" sizes="{}">',
+        (
+            (MIME_TYPES.get(fmt, f'image/{fmt}'),
+             ', '.join(f'{static(variant)} {width}w' for width, variant in variants),
+             sizes)
+            for fmt, variants in sorted(entry['variants'].items(), key=_preference)
+        ),
+    )
+    return format_html('<picture>{}{}</picture>', sources, img)
@@ -1,3 +1,1053 @@
-from django.test import TestCase
-
-# Create your tests here.
+import csv
+import datetime
+import hashlib
+import io
+import itertools
+import json
+import os
+import shutil
+import tempfile
+import time
+from unittest import mock, skipUnless
+
+from asgiref.sync import sync_to_async
+
+from django.apps import apps
+from django.conf import settings
+from django.contrib.admin import site
+from django.contrib.auth.models import User
+from django.contrib.sessions.backends.cached_db import SessionStore
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection, router
+from django.http import HttpResponse
+from django.template import Context, Template
+from django.test import Client, RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import path, reverse
+from django.utils import timezone
+
+from . import facets, search, views
+from .admin import EstimatedCountPaginator
+from .checks import check_shared_cache
+from .forms import ParticipationForm
+from .journal import SubmissionJournal
+from .loginhistory import LoginHistoryWriter
+from .perf import parse_prometheus, perf_registry
+from .ratelimit import rate_limiter
+from .models import (
+    CateringSelection, FacetCount, LoginDailySummary, LoginHistory, OrganizerEvent, Participation, UserAccount, Venue,
+    VenueBooking,
+)
+from .routers import PIN_COOKIE, pin_primary, replica_reads
+from .selection import select_participations
+from .templatetags import eventimages
+from .venues import venue_catalog
+
+
+_dates = itertools.count()
+
+
+def make_participation(**kwargs):
+    data = {
+        'name': 'Rahim',
+        'email': 'rahim@example.com',
+        'idea_title': 'Beach Party',
+        'description': 'A long description',
+        'category': 'birthday',
+        'budget_estimate': 5000,
+        # a different day each, so selections don't collide on the venue
+        'preferred_date': datetime.date(2026, 3, 1) + datetime.timedelta(days=next(_dates)),
+        'location': 'agrabad',
+        'venue': 'Hotel Agrabad',
+    }
+    data.update(kwargs)
+    return Participation.objects.create(**data)
+
+
+class OrganizerLoginMixin:
+    def login_as(self, role='organizer', email='org@example.com'):
+        user = UserAccount(email=email, role=role)
+        user.set_password('secret')
+        user.save()
+        session = self.client.session
+        session['user_id'] = user.id
+        session['role'] = user.role
+        session.save()
+        return user
+
+
+class OrganizerQueueTests(OrganizerLoginMixin, TestCase):
+    def setUp(self):
+        self.login_as()
+
+    def test_queue_is_keyset_paginated(self):
+        items = [make_participation(idea_title=f"Idea {i}") for i in range(views.QUEUE_PAGE_SIZE + 5)]
+
+        response = self.client.get(reverse('organizer'))
+        page = response.context['participations']
+        self.assertEqual(len(page), views.QUEUE_PAGE_SIZE)
+        self.assertEqual(page[0].id, items[-1].id)
+        self.assertEqual(response.context['next_cursor'], page[-1].id)
+
+        response = self.client.get(reverse('organizer'), {'before': page[-1].id})
+        older = response.context['participations']
+        self.assertEqual([p.id for p in older], [p.id for p in reversed(items[:5])])
+        self.assertIsNone(response.context['next_cursor'])
+
+    def test_queue_skips_selected_and_defers_description(self):
+        make_participation(selected_event='Taken')
+        pending = make_participation()
+
+        response = self.client.get(reverse('organizer'))
+        page = response.context['participations']
+        self.assertEqual([p.id for p in page], [pending.id])
+        self.assertIn('description', page[0].get_deferred_fields())
+
+
+class OrganizerSelectionTests(OrganizerLoginMixin, TestCase):
+    def setUp(self):
+        self.organizer = self.login_as()
+
+    def test_bulk_select_claims_pending_rows_once(self):
+        first, second = make_participation(), make_participation(idea_title='Concert')
+        taken = make_participation(selected_event='Gone')
+
+        response = self.client.post(reverse('organizer'), {
+            'participation_id': [first.id, second.id, taken.id],
+        })
+        self.assertRedirects(response, reverse('organizer'), fetch_redirect_response=False)
+        self.assertEqual(OrganizerEvent.objects.count(), 2)
+        self.assertEqual(
+            set(OrganizerEvent.objects.values_list('organizer', flat=True)),
+            {self.organizer.id},
+        )
+        self.assertFalse(Participation.objects.filter(selected_event__isnull=True).exists())
+
+    def test_select_reports_already_taken_ids(self):
+        participation = make_participation()
+        select_participations([participation.id], None)
+
+        selected, taken, _ = select_participations([participation.id], self.organizer.id)
+        self.assertEqual(selected, [])
+        self.assertEqual(taken, [participation.id])
+        self.assertEqual(OrganizerEvent.objects.count(), 1)
+
+
+class EventFeedTests(OrganizerLoginMixin, TestCase):
+    def setUp(self):
+        cache.clear()
+        self.login_as(role='participant', email='guest@example.com')
+
+    def test_feed_pages_are_cached_until_a_selection(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            select_participations([make_participation(idea_title='Mela').id], None)
+        self.client.get(reverse('p_event'))
+
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('p_event'))
+        self.assertContains(response, 'Mela')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            select_participations([make_participation(idea_title='Qawwali Night').id], None)
+        response = self.client.get(reverse('p_event'))
+        self.assertContains(response, 'Qawwali Night')
+
+    @override_settings(EVENT_FEED_PAGE_SIZE=1)
+    def test_feed_is_paginated(self):
+        for title in ('First', 'Second'):
+            select_participations([make_participation(idea_title=title).id], None)
+
+        response = self.client.get(reverse('p_event'), {'page': 2})
+        self.assertContains(response, 'First')
+        self.assertNotContains(response, 'Second')
+
+
+@override_settings(LOGIN_HISTORY_ASYNC=False)
+class LoginHistoryTests(TestCase):
+    def setUp(self):
+        self.user = UserAccount(email='guest@example.com', role='participant')
+        self.user.set_password('secret')
+        self.user.save()
+
+    def test_login_records_history_and_last_login(self):
+        response = self.client.post(reverse('login'), {'email': 'guest@example.com', 'password': 'secret'})
+        self.assertRedirects(response, reverse('p_event'), fetch_redirect_response=False)
+
+        self.assertEqual(LoginHistory.objects.filter(user=self.user).count(), 1)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.is_logged_in)
+        self.assertIsNotNone(self.user.last_login)
+
+    def test_writer_batches_queued_rows(self):
+        writer = LoginHistoryWriter()
+        with override_settings(LOGIN_HISTORY_ASYNC=True, LOGIN_HISTORY_BATCH_SIZE=2):
+            writer._ensure_started = lambda: None  # flush by hand, no thread
+            for _ in range(3):
+                writer.record(self.user, self.user.email)
+            self.assertEqual(writer.stats()['queue_depth'], 3)
+            self.assertEqual(writer.flush(), 3)
+
+        stats = writer.stats()
+        self.assertEqual((stats['queue_depth'], stats['written'], stats['flushes']), (0, 3, 2))
+        self.assertEqual(LoginHistory.objects.count(), 3)
+
+
+class LoginHistoryRetentionTests(TestCase):
+    def setUp(self):
+        self.user = UserAccount.objects.create(email='rina@example.com', role='participant')
+        self.now = timezone.now()
+
+    def login_at(self, days_ago, hour=10):
+        when = (self.now - datetime.timedelta(days=days_ago)).replace(hour=hour)
+        LoginHistory.objects.create(user=self.user, email=self.user.email, login_time=when)
+
+    def test_old_rows_are_rolled_up_in_batches(self):
+        for hour in (9, 12, 18):
+            self.login_at(100, hour)
+        self.login_at(95)
+        self.login_at(1)
+
+        # batch_size=2 splits day -100 across batches; its counts must still add up
+        call_command('prune_login_history', days=30, batch_size=2, pause=0, stdout=io.StringIO())
+
+        self.assertEqual(LoginHistory.objects.count(), 1)
+        summaries = {s.day: s for s in LoginDailySummary.objects.all()}
+        oldest = summaries[timezone.localdate(self.now - datetime.timedelta(days=100))]
+        self.assertEqual(oldest.login_count, 3)
+        self.assertEqual((oldest.first_login.hour, oldest.last_login.hour), (9, 18))
+        self.assertEqual(sum(s.login_count for s in summaries.values()), 4)
+
+    def test_summary_keeps_the_email_of_the_last_login(self):
+        self.login_at(100, 9)
+        LoginHistory.objects.create(
+            user=self.user, email='a.rina@example.com',
+            login_time=(self.now - datetime.timedelta(days=100)).replace(hour=18),
+        )
+        self.login_at(100, 12)
+
+        call_command('prune_login_history', days=30, batch_size=2, pause=0, stdout=io.StringIO())
+        self.assertEqual(LoginDailySummary.objects.get().email, 'a.rina@example.com')
+
+
+class PasswordHashingTests(TestCase):
+    @override_settings(PASSWORD_HASH_PBKDF2_ITERATIONS=1000)
+    def test_outdated_hash_is_upgraded_on_login(self):
+        user = UserAccount(email='old@example.com', role='participant')
+        with override_settings(PASSWORD_HASH_PBKDF2_ITERATIONS=500):
+            user.set_password('secret')
+        user.save()
+        self.assertIn('$500$', user.password)
+
+        self.assertTrue(user.check_password('secret'))
+        user.refresh_from_db()
+        self.assertIn('$1000$', user.password)
+        self.assertTrue(user.check_password('secret'))
+
+    @override_settings(PASSWORD_HASH_PBKDF2_ITERATIONS=1000, PASSWORD_HASH_OFFLOAD=True)
+    def test_offloaded_verification(self):
+        user = UserAccount(email='pool@example.com', role='participant')
+        user.set_password('secret')
+        self.assertTrue(user.check_password('secret'))
+        self.assertFalse(user.check_password('wrong'))
+
+
+class AccountMiddlewareTests(OrganizerLoginMixin, TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_identity_is_served_from_the_session(self):
+        user = self.login_as()
+        self.client.get(reverse('organizer'))  # first request upgrades the session
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('organizer'))
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse([q for q in queries if 'useraccount' in q['sql'] or 'django_session' in q['sql']])
+        self.assertEqual(response.wsgi_request.account, (user.id, user.email, 'organizer'))
+
+    def admin_client(self):
+        admin = Client()
+        admin.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'x'))
+        return admin
+
+    def test_admin_edit_invalidates_cached_identity(self):
+        user = self.login_as()
+        self.client.get(reverse('organizer'))
+
+        response = self.admin_client().post(reverse('admin:EventApp_useraccount_change', args=[user.pk]), {
+            'email': user.email, 'role': 'participant', 'last_login_0': '', 'last_login_1': '',
+        })
+        self.assertEqual(response.status_code, 302)
+
+        response = self.client.get(reverse('organizer'))
+        self.assertRedirects(response, reverse('login'), fetch_redirect_response=False)
+        self.assertEqual(response.wsgi_request.account.role, 'participant')
+
+    def test_admin_delete_logs_the_user_out(self):
+        user = self.login_as()
+        self.client.get(reverse('organizer'))
+        admin = self.admin_client()
+
+        admin.post(reverse('admin:EventApp_useraccount_changelist'), {
+            'action': 'delete_selected', '_selected_action': [user.pk], 'post': 'yes',
+        })
+
+        response = self.client.get(reverse('organizer'))
+        self.assertRedirects(response, reverse('login'), fetch_redirect_response=False)
+        self.assertIsNone(response.wsgi_request.account)
+
+    def test_deploy_check_wants_a_shared_cache(self):
+        self.assertEqual([error.id for error in check_shared_cache(None)], ['EventApp.W001'])
+        redis = {'default': {'BACKEND': 'django.core.cache.backends.redis.RedisCache', 'LOCATION': 'redis://x'}}
+        with override_settings(CACHES=redis):
+            self.assertEqual(check_shared_cache(None), [])
+
+
+def submission_data(**kwargs):
+    data = {
+        'name': 'Karim',
+        'email': 'karim@example.com',
+        'idea_title': 'Rooftop Concert',
+        'description': 'Live music',
+        'category': 'concert',
+        'budget_estimate': '20000',
+        'preferred_date': '2026-05-01',
+        'catering_type': 'none',
+        'location': 'gec',
+        'venue': 'K & K Convention Hall',
+        'consent': 'on',
+    }
+    data.update(kwargs)
+    return data
+
+
+class CateringAndBudgetTests(TestCase):
+    def test_submission_stores_typed_budget_and_catering_rows(self):
+        response = self.client.post(reverse('participate'), submission_data(
+            catering_type='full', fullmeal_items=['beef biriyani', 'borhani'],
+        ))
+        self.assertRedirects(response, reverse('p_event'), fetch_redirect_response=False)
+
+        participation = Participation.objects.get()
+        self.assertEqual(participation.budget_estimate, 20000)
+        self.assertEqual(
+            set(participation.catering_selections.values_list('item', flat=True)),
+            {'beef biriyani', 'borhani'},
+        )
+
+    def test_budget_and_catering_queries(self):
+        cheap = make_participation(budget_estimate=800)
+        feast = make_participation(budget_estimate=50000)
+        CateringSelection.objects.create(participation=feast, item='mutton biriyani')
+        CateringSelection.objects.create(participation=cheap, item='samosa')
+
+        self.assertEqual(list(Participation.objects.budget_between(0, 1000)), [cheap])
+        biriyani = CateringSelection.items_matching('biriyani')
+        self.assertIn('hyderabadi biriyani', biriyani)
+        self.assertEqual(list(Participation.objects.serving(*biriyani)), [feast])
+
+
+class UploadTests(TestCase):
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        self.enterContext(override_settings(MEDIA_ROOT=media_root))
+
+    def test_identical_attachments_are_stored_once(self):
+        for _ in range(2):
+            upload = SimpleUploadedFile('plan.pdf', b'%PDF same bytes', content_type='application/pdf')
+            response = self.client.post(reverse('participate'), submission_data(file=upload))
+            self.assertRedirects(response, reverse('p_event'), fetch_redirect_response=False)
+
+        first, second = Participation.objects.order_by('id')
+        digest = hashlib.sha256(b'%PDF same bytes').hexdigest()
+        self.assertEqual(first.file.name, f'blobs/{digest[:2]}/{digest}.pdf')
+        self.assertEqual(second.file.name, first.file.name)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            select_participations([first.id], None)
+        self.assertEqual(OrganizerEvent.objects.get().file.name, first.file.name)
+
+    @override_settings(UPLOAD_MAX_FILE_BYTES=8)
+    def test_oversized_attachment_is_rejected(self):
+        upload = SimpleUploadedFile('plan.pdf', b'x' * 64, content_type='application/pdf')
+        response = self.client.post(reverse('participate'), submission_data(file=upload))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('file', response.context['form'].errors)
+        self.assertContains(response, "File is larger than")
+        self.assertFalse(Participation.objects.exists())
+
+
+class ResponsiveImageTagTests(TestCase):
+    def render(self, manifest, path):
+        with mock.patch.object(eventimages, 'get_manifest', return_value=manifest):
+            return Template("{% load eventimages %}{% responsive_image path class='event-img' %}").render(
+                Context({'path': path})
+            )
+
+    def test_emits_srcset_per_format_in_preference_order(self):
+        manifest = {'EventApp/eventpics/sports.png': {
+            'source_sha256': 'x', 'width': 1200, 'height': 800,
+            'variants': {
+                'webp': [[320, 'EventApp/eventpics/variants/sports-320w.aa.webp']],
+                'avif': [[320, 'EventApp/eventpics/variants/sports-320w.bb.avif']],
+            },
+        }}
+        html = self.render(manifest, 'EventApp/eventpics/sports.png')
+        self.assertLess(html.index('image/avif'), html.index('image/webp'))
+        self.assertIn('sports-320w.bb.avif 320w', html)
+        self.assertIn('class="event-img"', html)
+
+    def test_falls_back_to_the_original_image(self):
+        html = self.render({}, 'EventApp/eventpics/sports.png')
+        self.assertTrue(html.startswith('<img src="/static/EventApp/eventpics/sports.png"'))
+
+
+@skipUnless(connection.vendor == 'sqlite', "EXPLAIN QUERY PLAN output is SQLite specific")
+class QueryPlanTests(TestCase):
+    """Every view and admin changelist query must be answered from an index."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.superuser = User.objects.create_superuser('admin', 'admin@example.com', 'x')
+
+    def assertUsesIndex(self, queryset):
+        sql, params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+            plan = [row[-1] for row in cursor.fetchall()]
+        full_scans = [
+            step for step in plan
+            if step.startswith('SCAN') and 'INDEX' not in step and 'CONSTANT ROW' not in step
+        ]
+        self.assertFalse(full_scans, f"full table scan in plan {plan} for {sql}")
+
+    def changelist_queryset(self, model, **params):
+        request = RequestFactory().get('/', params)
+        request.user = self.superuser
+        changelist = site._registry[model].get_changelist_instance(request)
+        return changelist.queryset[:changelist.list_per_page]
+
+    def test_view_queries(self):
+        pending = Participation.objects.filter(selected_event__isnull=True).order_by('-id')
+        self.assertUsesIndex(pending[:51])
+        self.assertUsesIndex(pending.filter(id__lt=100)[:51])
+        self.assertUsesIndex(OrganizerEvent.objects.select_related('participation').order_by('-selected_at')[:24])
+        self.assertUsesIndex(UserAccount.objects.filter(email='a@example.com'))
+        self.assertUsesIndex(Participation.objects.budget_between(1000, 5000))
+        self.assertUsesIndex(Participation.objects.serving('beef biriyani', 'kacchi').order_by('-id')[:50])
+        self.assertUsesIndex(VenueBooking.objects.filter(
+            location='gec', venue='Hotel Alif & Rasturant', date__range=('2026-01-01', '2026-12-31')))
+
+    def test_admin_changelist_filters(self):
+        day = {'preferred_date__gte': '2026-01-01', 'preferred_date__lt': '2026-01-02'}
+        self.assertUsesIndex(self.changelist_queryset(Participation, category='birthday'))
+        self.assertUsesIndex(self.changelist_queryset(Participation, **day))
+        self.assertUsesIndex(self.changelist_queryset(Participation, category='birthday', **day))
+        self.assertUsesIndex(self.changelist_queryset(OrganizerEvent, participation__category='birthday'))
+        self.assertUsesIndex(self.changelist_queryset(
+            OrganizerEvent, participation__preferred_date__gte='2026-01-01',
+            participation__preferred_date__lt='2026-01-02'))
+        organizer = UserAccount.objects.create(email='org@example.com', role='organizer')
+        OrganizerEvent.objects.create(participation=make_participation(), organizer=organizer)
+        self.assertUsesIndex(self.changelist_queryset(OrganizerEvent, organizer__id__exact=organizer.id))
+        self.assertUsesIndex(self.changelist_queryset(UserAccount, role='organizer'))
+        self.assertUsesIndex(self.changelist_queryset(
+            LoginHistory, login_time__gte='2026-01-01', login_time__lt='2026-01-02'))
+        self.assertUsesIndex(self.changelist_queryset(LoginHistory, user__id__exact=1))
+
+    def test_admin_list_filter_choices(self):
+        # AllValuesFieldListFilter lists the distinct values of these columns
+        self.assertUsesIndex(Participation.objects.values('category').distinct().order_by('category'))
+        self.assertUsesIndex(OrganizerEvent.objects.values('organizer').distinct())
+
+
+class ImportExportCommandTests(TestCase):
+    def write_temp(self, suffix, content):
+        fd, path = tempfile.mkstemp(suffix=suffix)
+        with os.fdopen(fd, 'w') as f:
+            f.write(content)
+        self.addCleanup(os.remove, path)
+        return path
+
+    def test_import_csv_validates_with_participation_form(self):
+        path = self.write_temp('.csv', (
+            "name,email,idea_title,description,category,budget_estimate,preferred_date,"
+            "catering_type,snack_items,location,venue,consent\n"
+            "Rina,rina@example.com,Mela,Fair,festival,9000,2026-04-14,snacks,samosa|momo,gec,K & K Convention Hall,on\n"
+            "Bad,bad@example.com,Mela,Fair,festival,9000,2026-04-14,none,,gec,Hotel Agrabad,on\n"
+        ))
+        err = io.StringIO()
+        call_command('import_participations', path, batch_size=1, stdout=io.StringIO(), stderr=err)
+
+        imported = Participation.objects.get()
+        self.assertEqual(imported.name, 'Rina')
+        self.assertEqual(set(imported.catering_selections.values_list('item', flat=True)), {'samosa', 'momo'})
+        self.assertIn('line 3', err.getvalue())  # venue not offered at that location
+
+    def test_import_jsonl_reports_malformed_lines(self):
+        good = {
+            'name': 'Rina', 'email': 'rina@example.com', 'idea_title': 'Mela', 'description': 'Fair',
+            'category': 'festival', 'budget_estimate': 9000, 'preferred_date': '2026-04-14',
+            'catering_type': 'none', 'location': 'gec', 'venue': 'K & K Convention Hall', 'consent': True,
+        }
+        path = self.write_temp('.jsonl', '{"name": "Broken",\n\n' + json.dumps(good) + '\n[1, 2]\n')
+        err = io.StringIO()
+        call_command('import_participations', path, stdout=io.StringIO(), stderr=err)
+
+        self.assertEqual(Participation.objects.get().name, 'Rina')
+        self.assertIn('line 1: not valid JSON', err.getvalue())
+        self.assertIn('line 4: not a JSON object', err.getvalue())
+
+    def test_export_jsonl_streams_selected_events(self):
+        participation = make_participation(idea_title='Baishakhi Mela')
+        select_participations([participation.id], None)
+        path = self.write_temp('.jsonl', '')
+
+        call_command('export_events', output=path, format='jsonl', stderr=io.StringIO())
+
+        with open(path) as f:
+            rows = [json.loads(line) for line in f]
+        self.assertEqual([row['idea_title'] for row in rows], ['Baishakhi Mela'])
+        self.assertEqual(rows[0]['participation_id'], participation.id)
+
+    def test_export_csv_defuses_spreadsheet_formulas(self):
+        select_participations([make_participation(idea_title='@SUM(A1:A9)').id], None)
+        path = self.write_temp('.csv', '')
+
+        call_command('export_events', output=path, stderr=io.StringIO())
+
+        with open(path, newline='') as f:
+            rows = list(csv.DictReader(f))
+        self.assertEqual(rows[0]['idea_title'], "'@SUM(A1:A9)")
+
+
+class AdminCsvExportTests(TestCase):
+    def setUp(self):
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'x'))
+
+    def test_export_honours_changelist_filters_and_search(self):
+        make_participation(idea_title='Wedding fair', category='wedding')
+        make_participation(idea_title='Wedding expo', category='corporate')
+        make_participation(idea_title='Birthday bash', category='birthday')
+
+        response = self.client.get(
+            reverse('admin:EventApp_participation_export'), {'category': 'wedding', 'q': 'Wedding'}
+        )
+
+        self.assertTrue(response.streaming)
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(lines[0].split(',')[:4], ['id', 'name', 'email', 'idea_title'])
+        self.assertEqual(len(lines), 2)
+        self.assertIn('Wedding fair', lines[1])
+
+    def test_export_defuses_spreadsheet_formulas(self):
+        make_participation(name='=HYPERLINK("http://evil.example")', idea_title='-2+3', category='wedding')
+
+        response = self.client.get(reverse('admin:EventApp_participation_export'))
+        row = next(csv.reader(b''.join(response.streaming_content).decode().splitlines()[1:]))
+        self.assertEqual(row[1:4], ['\'=HYPERLINK("http://evil.example")', 'rahim@example.com', "'-2+3"])
+
+    def test_changelist_links_export_with_current_filters(self):
+        response = self.client.get(reverse('admin:EventApp_participation_changelist'), {'category': 'wedding'})
+        self.assertContains(response, reverse('admin:EventApp_participation_export') + '?category=wedding')
+
+    def test_export_selected_action(self):
+        participation = make_participation(idea_title='Baishakhi Mela')
+        select_participations([participation.id], None)
+        event = OrganizerEvent.objects.get()
+
+        response = self.client.post(reverse('admin:EventApp_organizerevent_changelist'), {
+            'action': 'export_selected_csv', '_selected_action': [event.pk],
+        })
+
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(len(lines), 2)
+        self.assertIn('Baishakhi Mela', lines[1])
+
+
+class AdminChangelistTests(TestCase):
+    def setUp(self):
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'x'))
+
+    def add_logins(self, count):
+        for i in range(count):
+            user = UserAccount.objects.create(email=f'user{UserAccount.objects.count()}@example.com', role='participant')
+            LoginHistory.objects.create(user=user, email=user.email)
+
+    def changelist_queries(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse('admin:EventApp_loginhistory_changelist'))
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries)
+
+    def test_login_history_changelist_has_no_per_row_queries(self):
+        self.add_logins(2)
+        few = self.changelist_queries()
+        self.add_logins(20)
+        self.assertEqual(self.changelist_queries(), few)
+
+    @skipUnless(connection.vendor == 'sqlite', "reads sqlite_stat1")
+    def test_unfiltered_changelist_uses_the_estimated_count(self):
+        self.add_logins(5)
+        call_command('prune_login_history', stdout=io.StringIO())  # refreshes the statistics
+        with mock.patch.object(EstimatedCountPaginator, 'exact_below', 1):
+            with CaptureQueriesContext(connection) as ctx:
+                count = EstimatedCountPaginator(LoginHistory.objects.all(), 100).count
+            self.assertEqual(count, 5)
+            self.assertFalse([q for q in ctx.captured_queries if 'COUNT(' in q['sql']])
+
+            filtered = LoginHistory.objects.filter(email='user0@example.com')
+            self.assertEqual(EstimatedCountPaginator(filtered, 100).count, 1)
+
+
+class ReplicaRoutingTests(TestCase):
+    def setUp(self):
+        replica = {**connection.settings_dict, 'TEST': {'MIRROR': 'default'}}
+        patcher = mock.patch.dict(settings.DATABASES, {'replica': replica})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def reads_from(self, request):
+        @replica_reads
+        @pin_primary
+        def view(request):
+            response = HttpResponse()
+            response.db = router.db_for_read(Participation)
+            response.session_db = router.db_for_read(UserAccount)
+            return response
+        return view(request)
+
+    def test_read_only_views_read_the_queue_from_the_replica(self):
+        response = self.reads_from(RequestFactory().get('/'))
+        self.assertEqual((response.db, response.session_db), ('replica', 'default'))
+        self.assertEqual(router.db_for_read(Participation), 'default')  # outside the view
+
+    def test_client_reads_its_own_writes_from_the_primary(self):
+        response = self.reads_from(RequestFactory().post('/'))
+        self.assertEqual(response.db, 'default')
+        cookie = response.cookies[PIN_COOKIE]
+        self.assertEqual(cookie['max-age'], settings.REPLICA_STICKY_SECONDS)
+
+        request = RequestFactory().get('/')
+        request.COOKIES[PIN_COOKIE] = cookie.value
+        self.assertEqual(self.reads_from(request).db, 'default')
+
+    def test_writes_go_to_the_primary(self):
+        self.assertEqual(router.db_for_write(Participation, instance=Participation()), 'default')
+
+
+class AsyncURLs:
+    # the URL names the templates use, with the ASGI (ASYNC_VIEWS) views
+    urlpatterns = [
+        path('', views.home_async, name='home'),
+        path('register/', views.register, name='register'),
+        path('login/', views.login_view, name='login'),
+        path('logout/', views.logout_view, name='logout'),
+        path('organizer/', views.organizer_async, name='organizer'),
+        path('events/', views.p_event_async, name='p_event'),
+        path('participate/', views.participate_async, name='participate'),
+    ]
+
+
+@override_settings(ROOT_URLCONF=AsyncURLs)
+class AsyncViewTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def login_as(self, role):
+        user = UserAccount.objects.create(email=f'{role}@example.com', role=role)
+        session = SessionStore()
+        session['user_id'] = user.id
+        session['role'] = role
+        session.save()
+        self.async_client.cookies[settings.SESSION_COOKIE_NAME] = session.session_key
+        return user
+
+    async def test_feed(self):
+        await sync_to_async(self.login_as)('participant')
+        participation = await sync_to_async(make_participation)(idea_title='Baishakhi Mela')
+        await sync_to_async(select_participations)([participation.id], None)
+
+        response = await self.async_client.get('/events/')
+        self.assertContains(response, 'Baishakhi Mela')
+
+    async def test_organizer_queue_and_selection(self):
+        await sync_to_async(self.login_as)('organizer')
+        pending = await sync_to_async(make_participation)(idea_title='Rooftop Gig')
+
+        response = await self.async_client.get('/organizer/')
+        self.assertContains(response, 'Rooftop Gig')
+
+        response = await self.async_client.post('/organizer/', {'participation_id': [pending.id]})
+        self.assertRedirects(response, '/organizer/', fetch_redirect_response=False)
+        event = await OrganizerEvent.objects.select_related('organizer').aget()
+        self.assertEqual(event.organizer.email, 'organizer@example.com')
+
+    async def test_participate(self):
+        response = await self.async_client.post(
+            '/participate/', submission_data(catering_type='snacks', snack_items=['samosa', 'momo'])
+        )
+        self.assertRedirects(response, '/events/', fetch_redirect_response=False)
+        participation = await Participation.objects.aget()
+        items = {item async for item in participation.catering_selections.values_list('item', flat=True)}
+        self.assertEqual(items, {'samosa', 'momo'})
+        self.assertEqual((await FacetCount.objects.aget(facet='catering', value='snacks')).count, 1)
+
+    async def test_role_check(self):
+        await sync_to_async(self.login_as)('participant')
+        response = await self.async_client.get('/organizer/')
+        self.assertRedirects(response, '/login/', fetch_redirect_response=False)
+
+
+class VenueCatalogTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_catalog_is_seeded_and_served_from_memory(self):
+        self.assertIn('K & K Convention Hall', [v['name'] for v in venue_catalog.venues('gec')])
+        with self.assertNumQueries(0):
+            ParticipationForm(data={'location': 'gec'})
+            venue_catalog.venues('agrabad')
+
+    def test_admin_edit_reloads_the_catalog(self):
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'x'))
+        venue = Venue.objects.get(location='gec', name='K & K Convention Hall')
+        venue_catalog.venues('gec')
+
+        self.client.post(reverse('admin:EventApp_venue_change', args=[venue.pk]), {
+            'location': 'gec', 'name': 'K & K Convention Hall', 'capacity': '800', 'is_active': 'on',
+        })
+
+        self.assertIn({'name': 'K & K Convention Hall', 'capacity': 800}, venue_catalog.venues('gec'))
+
+    def test_endpoint_revalidates_with_etag(self):
+        response = self.client.get(reverse('venues'), {'location': 'gec'})
+        self.assertEqual(response['Cache-Control'], 'public, max-age=300')
+        self.assertIn('K & K Convention Hall', [v['name'] for v in response.json()['venues']])
+
+        again = self.client.get(reverse('venues'), {'location': 'gec'}, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(again.status_code, 304)
+        other = self.client.get(reverse('venues'), {'location': 'agrabad'}, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(other.status_code, 200)
+
+    def test_admin_changes_give_the_endpoint_a_new_etag(self):
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'x'))
+        before = self.client.get(reverse('venues'), {'location': 'gec'})
+        venue = Venue.objects.get(location='gec', name='K & K Convention Hall')
+
+        self.client.post(reverse('admin:EventApp_venue_changelist'), {
+            'action': 'delete_selected', '_selected_action': [venue.pk], 'post': 'yes',
+        })
+
+        after = self.client.get(reverse('venues'), {'location': 'gec'}, HTTP_IF_NONE_MATCH=before['ETag'])
+        self.assertEqual(after.status_code, 200)
+        self.assertNotEqual(after['ETag'], before['ETag'])
+        self.assertNotIn('K & K Convention Hall', [v['name'] for v in after.json()['venues']])
+
+    def test_form_only_accepts_venues_of_the_location(self):
+        form = ParticipationForm(data=submission_data(location='gec', venue='Hotel Agrabad'))
+        self.assertIn('venue', form.errors)
+
+
+class VenueBookingTests(OrganizerLoginMixin, TestCase):
+    def setUp(self):
+        self.organizer = self.login_as('organizer')
+        self.day = datetime.date(2026, 6, 1)
+
+    def test_selection_books_the_venue_once_per_day(self):
+        first = make_participation(idea_title='Wedding', preferred_date=self.day)
+        second = make_participation(idea_title='Reception', preferred_date=self.day)
+        other_day = make_participation(idea_title='Gaye Holud', preferred_date=self.day - datetime.timedelta(days=1))
+
+        response = self.client.post(reverse('organizer'), {'participation_id': [first.id, second.id, other_day.id]})
+
+        self.assertEqual(set(OrganizerEvent.objects.values_list('participation_id', flat=True)), {first.id, other_day.id})
+        second.refresh_from_db()
+        self.assertIsNone(second.selected_event)  # back in the queue
+        self.assertContains(self.client.get(response.url), 'already booked')
+
+    def test_form_rejects_a_booked_date(self):
+        select_participations([make_participation(venue='Hotel Agrabad', preferred_date=self.day).id], None)
+        form = ParticipationForm(data=submission_data(
+            location='agrabad', venue='Hotel Agrabad', preferred_date=self.day.isoformat()))
+        self.assertIn('preferred_date', form.errors)
+
+    def test_calendar_lists_free_dates(self):
+        select_participations([make_participation(venue='Hotel Agrabad', preferred_date=self.day).id], None)
+        self.client.logout()  # public endpoint; keep session queries out of the count
+
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('venue_calendar'), {
+                'location': 'agrabad', 'venue': 'Hotel Agrabad', 'start': '2026-05-31', 'end': '2026-06-02',
+            })
+
+        self.assertEqual(response.json(), {
+            'location': 'agrabad',
+            'venue': 'Hotel Agrabad',
+            'free': ['2026-05-31', '2026-06-02'],
+            'booked': ['2026-06-01'],
+        })
+
+    def test_calendar_rejects_bad_ranges(self):
+        url = reverse('venue_calendar')
+        for params in ({'start': '2026-06-01'}, {'start': '2026-06-02', 'end': '2026-06-01'},
+                       {'start': '2026-01-01', 'end': '2027-01-02'}, {'start': 'june', 'end': '2026-06-01'}):
+            with self.subTest(params=params):
+                self.assertEqual(self.client.get(url, {'location': 'agrabad', **params}).status_code, 400)
+
+
+class SearchTests(OrganizerLoginMixin, TestCase):
+    def setUp(self):
+        self.login_as('organizer')
+        self.beach = make_participation(idea_title='Beach Party', description='Bonfire and music by the sea')
+        self.music = make_participation(idea_title='Rooftop Concert', description='Live music and a beach themed stage')
+        self.other = make_participation(idea_title='Book Fair', description='Stalls')
+
+    def test_ranked_search_prefers_title_matches(self):
+        self.assertEqual(search.ranked_ids('beach'), [self.beach.id, self.music.id])
+        self.assertEqual(search.ranked_ids('musi beach'), [self.beach.id, self.music.id])  # prefixes, all words
+        self.assertEqual(search.ranked_ids('"unbalanced OR (*'), [])  # user input is never FTS syntax
+
+    def test_index_follows_updates_and_deletes(self):
+        Participation.objects.filter(pk=self.other.pk).update(idea_title='Beach Book Fair')
+        self.beach.delete()
+        self.assertEqual(set(search.ranked_ids('beach')), {self.music.id, self.other.id})
+
+    def test_organizer_search_shows_pending_matches(self):
+        select_participations([self.music.id], None)
+        response = self.client.get(reverse('organizer'), {'q': 'beach'})
+        self.assertEqual([p.id for p in response.context['participations']], [self.beach.id])
+
+    def test_rank_window_counts_only_candidates(self):
+        select_participations([self.music.id], None)  # the newest match
+        pending = Participation.objects.filter(selected_event__isnull=True)
+        with mock.patch.object(search, 'RANK_WINDOW', 1):
+            self.assertEqual(search.ranked_ids('beach', queryset=pending), [self.beach.id])
+
+    def test_organizer_search_ranks_within_the_facets(self):
+        Participation.objects.filter(pk=self.music.pk).update(category='wedding')
+        with mock.patch.object(views, 'QUEUE_PAGE_SIZE', 1):
+            response = self.client.get(reverse('organizer'), {'q': 'beach', 'category': 'wedding'})
+        self.assertEqual([p.id for p in response.context['participations']], [self.music.id])
+
+    def test_admin_search_uses_the_index(self):
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'x'))
+        response = self.client.get(reverse('admin:EventApp_participation_changelist'), {'q': 'bonfire'})
+        self.assertEqual([p.id for p in response.context['cl'].result_list], [self.beach.id])
+
+    def test_admin_search_still_matches_names(self):
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'x'))
+        Participation.objects.filter(pk=self.other.pk).update(name='Karim')
+        response = self.client.get(reverse('admin:EventApp_participation_changelist'), {'q': 'karim'})
+        self.assertEqual([p.id for p in response.context['cl'].result_list], [self.other.id])
+
+
+class FacetTests(OrganizerLoginMixin, TestCase):
+    def setUp(self):
+        self.login_as('organizer')
+
+    def counts(self):
+        return {(row.facet, row.value): row.count for row in FacetCount.objects.filter(count__gt=0)}
+
+    def test_counters_follow_submissions_and_selections(self):
+        self.client.post(reverse('participate'), submission_data())
+        self.client.post(reverse('participate'), submission_data(category='wedding', budget_estimate='250000'))
+        self.assertEqual(self.counts()['category', 'concert'], 1)
+        self.assertEqual(self.counts()['location', 'gec'], 2)
+        self.assertEqual(self.counts()['budget', '100k_500k'], 1)
+
+        wedding = Participation.objects.get(category='wedding')
+        self.client.post(reverse('organizer'), {'participation_id': wedding.id})
+        self.assertNotIn(('category', 'wedding'), self.counts())
+        self.assertEqual(self.counts()['location', 'gec'], 1)
+
+        incremental = self.counts()
+        facets.rebuild()
+        self.assertEqual(self.counts(), incremental)
+
+    def test_organizer_filters_the_queue_and_shows_counts(self):
+        wedding = make_participation(category='wedding', budget_estimate=60000)
+        make_participation(category='wedding', budget_estimate=5000)
+        make_participation(category='concert', budget_estimate=60000)
+        facets.rebuild()
+
+        with self.assertNumQueries(1):
+            facets.facet_counts()
+
+        response = self.client.get(reverse('organizer'), {'category': 'wedding', 'budget': '50k_100k'})
+        self.assertEqual([p.id for p in response.context['participations']], [wedding.id])
+        category = next(f for f in response.context['facets'] if f['name'] == 'category')
+        self.assertEqual(
+            [(v['value'], v['count'], v['active']) for v in category['values']],
+            [('wedding', 2, True), ('concert', 1, False)],
+        )
+        # unknown values are ignored rather than emptying the queue
+        response = self.client.get(reverse('organizer'), {'category': 'nonsense'})
+        self.assertEqual(len(response.context['participations']), 3)
+
+
+class WriteBehindTests(TestCase):
+    def setUp(self):
+        journal_dir = tempfile.mkdtemp()
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, journal_dir)
+        self.addCleanup(shutil.rmtree, media_root)
+        self.enterContext(override_settings(
+            SUBMISSION_WRITE_BEHIND=True, SUBMISSION_JOURNAL_DIR=journal_dir,
+            SUBMISSION_DRAIN_IN_BACKGROUND=False, MEDIA_ROOT=media_root,
+        ))
+        self.journal = SubmissionJournal()
+        self.enterContext(mock.patch('EventApp.journal.submission_journal', self.journal))
+
+    def test_submission_is_journaled_then_drained(self):
+        upload = SimpleUploadedFile('plan.pdf', b'%PDF plan', content_type='application/pdf')
+        response = self.client.post(reverse('participate'), submission_data(
+            catering_type='snacks', snack_items=['samosa'], file=upload))
+        self.assertRedirects(response, reverse('participate'), fetch_redirect_response=False)
+        self.assertFalse(Participation.objects.exists())
+
+        self.assertEqual(self.journal.drain(), 1)
+        participation = Participation.objects.get()
+        self.assertEqual(participation.preferred_date, datetime.date(2026, 5, 1))
+        self.assertTrue(participation.file.name.startswith('blobs/'))
+        self.assertEqual(list(participation.catering_selections.values_list('item', flat=True)), ['samosa'])
+        self.assertEqual(FacetCount.objects.get(facet='catering', value='snacks').count, 1)
+        self.assertEqual(self.journal.backlog_bytes(), 0)
+
+    def test_receipt_is_shown_after_the_redirect(self):
+        response = self.client.post(reverse('participate'), submission_data(), follow=True)
+        with open(os.path.join(settings.SUBMISSION_JOURNAL_DIR, 'submissions.jsonl')) as journal:
+            receipt = json.loads(journal.readline())['receipt']
+        self.assertContains(response, f"Your receipt: {receipt}")
+
+    def test_bad_file_is_set_aside_and_later_files_still_drain(self):
+        self.client.post(reverse('participate'), submission_data())
+        active = os.path.join(settings.SUBMISSION_JOURNAL_DIR, 'submissions.jsonl')
+        with open(active, 'rb') as journal:
+            record = json.loads(journal.read())
+        os.remove(active)
+        bad = os.path.join(settings.SUBMISSION_JOURNAL_DIR, 'submissions.1.sealed')
+        with open(bad, 'w') as leftover:
+            leftover.write(json.dumps({**record, 'receipt': 'bad', 'category': None}) + '\n')
+        with open(os.path.join(settings.SUBMISSION_JOURNAL_DIR, 'submissions.2.sealed'), 'w') as leftover:
+            leftover.write(json.dumps(record) + '\n')
+
+        with self.assertLogs('EventApp.journal', 'ERROR'):
+            self.assertEqual(self.journal.drain(), 1)
+        self.assertTrue(os.path.exists(bad + '.failed'))
+        self.assertEqual(self.journal.stats()['quarantined'], 1)
+        self.assertEqual(self.journal.retry_failed(), 1)
+        self.assertTrue(os.path.exists(bad))
+
+    def test_drainer_starts_with_the_app(self):
+        with override_settings(SUBMISSION_DRAIN_IN_BACKGROUND=True), \
+                mock.patch.object(self.journal, '_ensure_started') as ensure_started:
+            apps.get_app_config('EventApp').ready()
+        ensure_started.assert_called_once()
+
+    def test_replay_skips_drained_records_and_torn_lines(self):
+        self.client.post(reverse('participate'), submission_data())
+        with open(os.path.join(settings.SUBMISSION_JOURNAL_DIR, 'submissions.jsonl'), 'rb') as journal:
+            record = journal.read()
+        self.journal.drain()
+
+        # crash after the insert committed but before the file was deleted,
+        # with a half-written record at the end
+        with open(os.path.join(settings.SUBMISSION_JOURNAL_DIR, 'submissions.1.sealed'), 'wb') as leftover:
+            leftover.write(record + record[:20])
+        self.assertEqual(self.journal.drain(), 0)
+        self.assertEqual(Participation.objects.count(), 1)
+        self.assertEqual(self.journal.stats()['skipped'], 1)
+
+
+@override_settings(RATELIMITS={'login': [('ip', 5, 60), ('email', 2, 60)], 'participate': [('ip', 1, 60)]})
+class RateLimitTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        user = UserAccount(email='rahim@example.com', role='participant')
+        user.set_password('secret')
+        user.save()
+
+    def test_login_attempts_per_email_are_limited_before_any_query(self):
+        for _ in range(2):
+            self.client.post(reverse('login'), {'email': 'rahim@example.com', 'password': 'wrong'})
+
+        rejected = rate_limiter.rejected['login', 'email']
+        with self.assertNumQueries(0), mock.patch.object(UserAccount, 'check_password') as check_password:
+            response = self.client.post(reverse('login'), {'email': 'Rahim@example.com ', 'password': 'secret'})
+        self.assertEqual(response.status_code, 429)
+        self.assertGreater(int(response['Retry-After']), 0)
+        check_password.assert_not_called()
+        self.assertEqual(rate_limiter.rejected['login', 'email'], rejected + 1)
+
+        # other accounts from the same address still get through, up to the IP bucket
+        response = self.client.post(reverse('login'), {'email': 'karim@example.com', 'password': 'x'})
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(self.client.get(reverse('login')).status_code, 200)  # GETs are not limited
+
+    def test_rejected_requests_spend_no_tokens(self):
+        for _ in range(2):
+            self.client.post(reverse('login'), {'email': 'rahim@example.com', 'password': 'wrong'})
+        for _ in range(3):  # turned away by the email bucket
+            self.assertEqual(
+                self.client.post(reverse('login'), {'email': 'rahim@example.com', 'password': 'x'}).status_code, 429)
+
+        # the IP bucket (5) only paid for the first two
+        for n in range(3):
+            response = self.client.post(reverse('login'), {'email': f'user{n}@example.com', 'password': 'x'})
+            self.assertEqual(response.status_code, 302)
+
+    @override_settings(RATELIMIT_IP_HEADER='HTTP_X_FORWARDED_FOR', RATELIMIT_TRUSTED_PROXIES=1)
+    def test_forwarded_for_is_read_from_the_trusted_proxy_hop(self):
+        self.client.post(reverse('participate'), submission_data(), HTTP_X_FORWARDED_FOR='10.0.0.1, 198.51.100.7')
+        # a made-up leftmost address doesn't give the client a fresh bucket
+        response = self.client.post(reverse('participate'), submission_data(),
+                                    HTTP_X_FORWARDED_FOR='10.9.9.9, 198.51.100.7')
+        self.assertEqual(response.status_code, 429)
+        response = self.client.post(reverse('participate'), submission_data(), HTTP_X_FORWARDED_FOR='198.51.100.8')
+        self.assertEqual(response.status_code, 302)
+
+    def test_buckets_refill(self):
+        self.client.post(reverse('participate'), submission_data())
+        self.assertEqual(self.client.post(reverse('participate'), submission_data()).status_code, 429)
+        with mock.patch('EventApp.ratelimit.time.time', return_value=time.time() + 61):
+            self.assertEqual(self.client.post(reverse('participate'), submission_data()).status_code, 302)
+
+
+class PerfInstrumentationTests(OrganizerLoginMixin, TestCase):
+    def setUp(self):
+        perf_registry.reset()
+        self.login_as('organizer')
+        make_participation()
+
+    def test_views_are_measured_and_exported(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('organizer'))
+        query_count = len(queries)
+
+        histograms = perf_registry.views['organizer']
+        self.assertEqual(histograms['request_duration_seconds'].count, 1)
+        self.assertEqual(histograms['db_queries'].sum, query_count)
+        self.assertGreater(histograms['template_duration_seconds'].sum, 0)
+        self.assertEqual(histograms['response_bytes'].sum, len(response.content))
+
+        metrics = self.client.get(reverse('metrics'))
+        self.assertEqual(metrics['Content-Type'], 'text/plain; version=0.0.4; charset=utf-8')
+        text = metrics.content.decode()
+        self.assertIn('eventapp_request_duration_seconds_bucket{view="organizer",le="+Inf"} 1', text)
+        self.assertIn('eventapp_login_history_queue_depth', text)
+        parsed = parse_prometheus(text)['organizer']['db_queries']
+        self.assertEqual((parsed.count, parsed.sum, parsed.counts), (1, query_count, histograms['db_queries'].counts))
+
+    def test_metrics_are_only_served_to_allowed_addresses(self):
+        self.assertEqual(self.client.get(reverse('metrics'), REMOTE_ADDR='203.0.113.9').status_code, 403)
+
+    async def test_async_requests_count_their_queries(self):
+        self.async_client.cookies = self.client.cookies
+        await self.async_client.get(reverse('organizer'))
+        self.assertGreater(perf_registry.views['organizer']['db_queries'].sum, 0)
+        self.assertGreater(perf_registry.views['organizer']['template_duration_seconds'].sum, 0)
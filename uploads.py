@@ -0,0 +1,89 @@
+import hashlib
+import os
+
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
+from django.core.files.uploadhandler import StopUpload, TemporaryFileUploadHandler
+from django.http import QueryDict
+from django.utils.datastructures import MultiValueDict
+from django.utils.deconstruct import deconstructible
+
+
+def _reject(request, field_name, message):
+    # read back by views.participate and shown as a form error
+    if not hasattr(request, 'upload_errors'):
+        request.upload_errors = {}
+    request.upload_errors[field_name] = message
+
+
+class HashingUploadHandler(TemporaryFileUploadHandler):
+    """
+    Streams every uploaded file to a temporary file while computing its SHA-256.
+
+    Requests larger than ``UPLOAD_MAX_REQUEST_BYTES`` (by Content-Length) are
+    rejected before any of the body is read, and a file growing past
+    ``UPLOAD_MAX_FILE_BYTES`` stops the upload at that chunk.  The digest is
+    left on the uploaded file as ``sha256`` for ContentAddressedStorage.
+    """
+
+    def handle_raw_input(self, input_data, META, content_length, boundary, encoding=None):
+        if content_length > settings.UPLOAD_MAX_REQUEST_BYTES:
+            _reject(self.request, 'file', "Upload is too large.")
+            return QueryDict(encoding=encoding), MultiValueDict()
+        return None
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.sha256 = hashlib.sha256()
+        self.received = 0
+
+    def receive_data_chunk(self, raw_data, start):
+        self.received += len(raw_data)
+        if self.received > settings.UPLOAD_MAX_FILE_BYTES:
+            _reject(
+                self.request, self.field_name,
+                f"File is larger than {settings.UPLOAD_MAX_FILE_BYTES // (1024 * 1024)} MB.",
+            )
+            self.upload_interrupted()
+            # read and discard the rest of the body (at most
+            # UPLOAD_MAX_REQUEST_BYTES) so the browser gets the form back with
+            # this error instead of a connection reset
+            raise StopUpload(connection_reset=False)
+        self.sha256.update(raw_data)
+        self.file.write(raw_data)
+
+    def file_complete(self, file_size):
+        uploaded = super().file_complete(file_size)
+        uploaded.sha256 = self.sha256.hexdigest()
+        return uploaded
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    Stores each distinct file content once, as ``blobs/<aa>/<sha256><ext>``.
+
+    Saving content that is already stored returns the existing name, so
+    re-submitted attachments and the copy made into OrganizerEvent.file share
+    one blob.  The ``upload_to`` prefix of the field is not used.
+    """
+
+    def save(self, name, content, max_length=None):
+        digest = getattr(content, 'sha256', None) or self._digest(content)
+        ext = os.path.splitext(name)[1].lower()
+        blob_name = f"blobs/{digest[:2]}/{digest}{ext}"
+        if self.exists(blob_name):
+            return blob_name
+        return super().save(blob_name, content, max_length=max_length)
+
+    def _digest(self, content):
+        sha256 = hashlib.sha256()
+        if hasattr(content, 'seek'):
+            content.seek(0)
+        for chunk in content.chunks():
+            sha256.update(chunk)
+        content.seek(0)
+        return sha256.hexdigest()
+
+
+content_addressed_storage = ContentAddressedStorage()
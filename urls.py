@@ -14,14 +14,35 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
+from importlib import import_module
+
+from django.conf import settings
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import URLPattern, path, include
+
+from EventApp import views
+
+
+def async_versions(patterns):
+    # ASYNC_VIEWS: the same routes and names, served by views.*_async
+    return [
+        URLPattern(pattern.pattern, views.ASYNC_VERSIONS[pattern.callback], pattern.default_args, pattern.name)
+        if isinstance(pattern, URLPattern) and pattern.callback in views.ASYNC_VERSIONS else pattern
+        for pattern in patterns
+    ]
+
+
+app_urls = 'EventApp.urls'
+if settings.ASYNC_VIEWS:
+    app_urls = async_versions(import_module(app_urls).urlpatterns)
 
 urlpatterns = [
     path('admin/', admin.site.urls),
-    path('', include('EventApp.urls')),
+    path('venues/', views.venues_json, name='venues'),
+    path('venues/calendar/', views.venue_calendar, name='venue_calendar'),
+    path('metrics/', views.metrics, name='metrics'),
+    path('', include(app_urls)),
 ]
-from django.conf import settings
 from django.conf.urls.static import static
 
 urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
@@ -0,0 +1,76 @@
+import hashlib
+import threading
+import time
+
+from django.core.cache import cache
+
+from .models import Venue
+
+# Like the feed, the catalog is stamped with a version kept in the default
+# cache; invalidate_venue_catalog() bumps it and every process reloads its
+# in-memory copy on its next lookup.  Other processes only see the bump when
+# that cache is shared (REDIS_URL, see CACHES in settings); with the
+# per-process LocMemCache an admin edit refreshes just the process that saved it.
+CATALOG_VERSION_KEY = 'venue_catalog:version'
+
+
+def invalidate_venue_catalog():
+    try:
+        cache.incr(CATALOG_VERSION_KEY)
+    except ValueError:
+        cache.add(CATALOG_VERSION_KEY, time.time_ns(), timeout=None)
+
+
+class VenueCatalog:
+    """Active venues per location, held in memory and reloaded only when invalidated."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version = None
+        self._by_location = {}
+
+    def _rows(self):
+        return (Venue.objects.filter(is_active=True)
+                .order_by('location', 'id')
+                .values_list('location', 'name', 'capacity'))
+
+    def _install(self, version, rows):
+        by_location = {}
+        for location, name, capacity in rows:
+            by_location.setdefault(location, []).append({'name': name, 'capacity': capacity})
+        self._by_location = by_location
+        self._version = version
+
+    def _current(self):
+        version = cache.get(CATALOG_VERSION_KEY)
+        if version is None:
+            cache.add(CATALOG_VERSION_KEY, time.time_ns(), timeout=None)
+            version = cache.get(CATALOG_VERSION_KEY)
+        if version != self._version:
+            with self._lock:
+                if version != self._version:
+                    self._install(version, list(self._rows()))
+        return self._version, self._by_location
+
+    async def arefresh(self):
+        """Reload with the async ORM if stale; async views call this before building a form."""
+        version = await cache.aget(CATALOG_VERSION_KEY)
+        if version is None:
+            await cache.aadd(CATALOG_VERSION_KEY, time.time_ns(), timeout=None)
+            version = await cache.aget(CATALOG_VERSION_KEY)
+        if version != self._version:
+            self._install(version, [row async for row in self._rows()])
+
+    def venues(self, location):
+        """[{'name': ..., 'capacity': ...}, ...] for ``location``, in admin order."""
+        return self._current()[1].get(location, [])
+
+    def choices(self, location):
+        return [(venue['name'], venue['name']) for venue in self.venues(location)]
+
+    def etag(self, location):
+        version, _ = self._current()
+        return hashlib.md5(f'{version}:{location}'.encode()).hexdigest()
+
+
+venue_catalog = VenueCatalog()
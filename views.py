@@ -1,14 +1,41 @@
-from django.shortcuts import render, redirect, get_object_or_404
+import datetime
+from urllib.parse import urlencode
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden, JsonResponse
+from django.shortcuts import render, redirect
 from django.contrib import messages
 from django.utils import timezone
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition, require_GET
 
-from .models import UserAccount, OrganizerEvent, LoginHistory, Participation
+from .models import UserAccount, Participation, VenueBooking
+from .facets import active_filters, afacet_counts, count_added, facet_counts, filter_queue
+from .feed import arender_feed_page, render_feed_page
 from .forms import ParticipationForm
+from .journal import journal_submission
+from .perf import prometheus_text
+from .loginhistory import login_history_writer
+from .middleware import remember_account
+from .ratelimit import rate_limited
+from .routers import pin_primary, replica_reads
+from .search import ranked_ids
+from .selection import select_participations
+from .venues import venue_catalog
+
+# columns the organizer card template actually shows
+QUEUE_COLUMNS = (
+    'id', 'name', 'email', 'idea_title', 'category', 'budget_estimate',
+    'preferred_date', 'location', 'venue', 'file',
+)
+QUEUE_PAGE_SIZE = 50
 
 
 # =====================================================
 # HOME
 # =====================================================
+@replica_reads
 def home(request):
     return render(request, "homepage.html")
 
@@ -16,6 +43,8 @@ def home(request):
 # =====================================================
 # REGISTER
 # =====================================================
+@rate_limited('register')
+@pin_primary
 def register(request):
     if request.method == "POST":
         email = request.POST.get('email', '').strip().lower()
@@ -43,6 +72,8 @@ def register(request):
 # =====================================================
 # LOGIN
 # =====================================================
+@rate_limited('login')
+@pin_primary
 def login_view(request):
     if request.method == "POST":
         email = request.POST.get('email', '').strip().lower()
@@ -52,20 +83,16 @@ def login_view(request):
             user = UserAccount.objects.get(email=email)
 
             if user.check_password(password):
-                # session store
-                request.session['user_id'] = user.id
-                request.session['role'] = user.role
+                # session store (id/email/role, read back by AccountMiddleware)
+                remember_account(request, user)
 
-                # update LoginHistory
-                LoginHistory.objects.create(
-                    user=user,
-                    email=email
-                )
+                # update LoginHistory (written in batches in the background)
+                login_history_writer.record(user, email)
 
                 # update last login
                 user.last_login = timezone.now()
                 user.is_logged_in = True
-                user.save()
+                user.save(update_fields=['last_login', 'is_logged_in'])
 
                 # redirect based on role
                 if user.role == 'organizer':
@@ -96,74 +123,334 @@ def logout_view(request):
 # =====================================================
 # ORGANIZER PAGE (SELECT SUBMISSIONS)
 # =====================================================
+@replica_reads
+@pin_primary
 def organizer(request):
-    if not request.session.get('user_id'):
+    if request.account is None:
         return redirect('login')
 
-    if request.session.get('role') != 'organizer':
+    if request.account.role != 'organizer':
         messages.error(request, "Access denied")
         return redirect('login')
 
-    participations = Participation.objects.filter(selected_event__isnull=True).order_by('-id')
-
     if request.method == "POST":
-        participation_id = request.POST.get("participation_id")
-        participation = get_object_or_404(Participation, id=participation_id)
-
-        organizer_user = UserAccount.objects.get(id=request.session['user_id'])
-
-        # Save into OrganizerEvent table
-        OrganizerEvent.objects.create(
-            organizer_email=organizer_user.email,  # Organizer email
-            participant_name=participation.name,
-            participant_email=participation.email,
-            idea_title=participation.idea_title,
-            category=participation.category,
-            budget_estimate=participation.budget_estimate or 0.0,
-            preferred_date=participation.preferred_date,
-            location=participation.location,
-            venue=participation.venue,
-            file=participation.file
-        )
-
-        # Mark participation as selected
-        participation.selected_event = participation.idea_title
-        participation.date_selected = timezone.now()
-        participation.save()
-
-        messages.success(request, f"'{participation.idea_title}' selected successfully!")
+        # one card or several checked cards ("select these N participations")
+        participation_ids = [
+            pk for pk in request.POST.getlist("participation_id") if pk.isdigit()
+        ]
+        if not participation_ids:
+            messages.error(request, "No submission selected")
+            return redirect('organizer')
+
+        selected, taken, unavailable = select_participations(participation_ids, request.account.id)
+
+        for participation in selected:
+            messages.success(request, f"'{participation.idea_title}' selected successfully!")
+        if taken:
+            messages.warning(
+                request,
+                "Already selected by another organizer: "
+                + ", ".join(f"#{pk}" for pk in taken),
+            )
+        for participation in unavailable:
+            messages.error(
+                request,
+                f"'{participation.idea_title}' not selected: {participation.venue} is already "
+                f"booked on {participation.preferred_date}.",
+            )
         return redirect('organizer')
 
-    return render(request, "organizer.html", {'participations': participations})
+    queue = (
+        Participation.objects
+        .filter(selected_event__isnull=True)
+        .only(*QUEUE_COLUMNS)
+        .order_by('-id')
+    )
+    # ?category=&location=&catering=&budget=: narrow the queue; counts come from FacetCount
+    filters = active_filters(request.GET)
+    queue = filter_queue(queue, filters)
+
+    # ?q=: the best full-text matches instead of the newest page
+    query = request.GET.get('q', '').strip()
+    if query:
+        # ranks only the filtered queue, so facets narrow the matches instead of the top N
+        ids = ranked_ids(query, limit=QUEUE_PAGE_SIZE, queryset=queue)
+        by_id = queue.in_bulk(ids)
+        return render(request, "organizer.html", {
+            'participations': [by_id[pk] for pk in ids if pk in by_id],
+            'query': query,
+            'is_first_page': True,
+            'facets': facet_counts(filters),
+            'filters': filters,
+        })
+
+    # keyset pagination: ?before=<id> shows the next older page
+    before = request.GET.get('before', '')
+    if before.isdigit():
+        queue = queue.filter(id__lt=int(before))
+
+    participations = list(queue[:QUEUE_PAGE_SIZE + 1])
+    next_cursor = None
+    if len(participations) > QUEUE_PAGE_SIZE:
+        participations = participations[:QUEUE_PAGE_SIZE]
+        next_cursor = participations[-1].id
+
+    return render(request, "organizer.html", {
+        'participations': participations,
+        'next_cursor': next_cursor,
+        'is_first_page': not before.isdigit(),
+        'facets': facet_counts(filters),
+        'filters': filters,
+        'filter_query': urlencode(filters),
+    })
 
 
 
 # =====================================================
 # PARTICIPANT VIEW EVENTS
 # =====================================================
+@replica_reads
 def p_event(request):
-    if not request.session.get('user_id'):
+    if request.account is None:
         return redirect('login')
 
-    if request.session.get('role') != 'participant':
+    if request.account.role != 'participant':
         messages.error(request, "Access denied")
         return redirect('login')
 
-    events = OrganizerEvent.objects.all().order_by('-selected_at')
-    return render(request, "P_Event.html", {'events': events})
+    page = request.GET.get('page', '')
+    page_number = int(page) if page.isdigit() and int(page) > 0 else 1
+    return HttpResponse(render_feed_page(page_number))
 
 
 # =====================================================
 # PARTICIPATION FORM
 # =====================================================
+def _bound_participation_form(request):
+    # reading request.POST/FILES parses the multipart body
+    form = ParticipationForm(request.POST, request.FILES)
+    # size limits enforced by uploads.HashingUploadHandler while streaming
+    for field, error in getattr(request, 'upload_errors', {}).items():
+        form.add_error(field, error)
+    return form
+
+
+@rate_limited('participate')
+@pin_primary
 def participate(request):
     if request.method == "POST":
-        form = ParticipationForm(request.POST, request.FILES)
+        form = _bound_participation_form(request)
         if form.is_valid():
-            form.save()
+            if settings.SUBMISSION_WRITE_BEHIND:
+                # journaled now, inserted by the drainer in a moment
+                receipt = journal_submission(form)
+                messages.success(request, f"Submission received. Your receipt: {receipt}")
+                # the feed page is cached and shows no messages
+                return redirect('participate')
+            count_added([form.save()])
             messages.success(request, "Submission successful")
             return redirect('p_event')
     else:
         form = ParticipationForm()
 
     return render(request, "participate.html", {'form': form})
+
+
+# =====================================================
+# VENUES OF A LOCATION (JSON for participate.html)
+# =====================================================
+def _venues_etag(request):
+    return venue_catalog.etag(request.GET.get('location', ''))
+
+
+@require_GET
+@cache_control(public=True, max_age=300)
+@condition(etag_func=_venues_etag)
+def venues_json(request):
+    # served from the in-memory catalog; ETag changes when venues are edited
+    location = request.GET.get('location', '')
+    return JsonResponse({'location': location, 'venues': venue_catalog.venues(location)})
+
+
+
+# =====================================================
+# VENUE CALENDAR (free dates of a venue, JSON)
+# =====================================================
+CALENDAR_MAX_DAYS = 366
+
+
+@require_GET
+def venue_calendar(request):
+    location = request.GET.get('location', '')
+    venue = request.GET.get('venue', '')
+    try:
+        start = datetime.date.fromisoformat(request.GET['start'])
+        end = datetime.date.fromisoformat(request.GET['end'])
+    except (KeyError, ValueError):
+        return JsonResponse({'error': "start and end (YYYY-MM-DD) are required"}, status=400)
+    if not start <= end or (end - start).days >= CALENDAR_MAX_DAYS:
+        return JsonResponse({'error': f"range must be 1-{CALENDAR_MAX_DAYS} days"}, status=400)
+
+    # one range scan of venue_booking_unique
+    booked = set(
+        VenueBooking.objects
+        .filter(location=location, venue=venue, date__range=(start, end))
+        .values_list('date', flat=True)
+    )
+    days = (start + datetime.timedelta(days=n) for n in range((end - start).days + 1))
+    return JsonResponse({
+        'location': location,
+        'venue': venue,
+        'free': [day.isoformat() for day in days if day not in booked],
+        'booked': sorted(day.isoformat() for day in booked),
+    })
+
+# =====================================================
+# METRICS (Prometheus text format, see perf.py)
+# =====================================================
+@require_GET
+def metrics(request):
+    if request.META.get('REMOTE_ADDR') not in settings.PERF_METRICS_ALLOWED_IPS:
+        return HttpResponseForbidden()
+    return HttpResponse(prometheus_text(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+# =====================================================
+# ASYNC VERSIONS (ASGI)
+# =====================================================
+# Same pages for an ASGI deployment: reads use the async ORM, so a request
+# waiting on the database doesn't hold a worker thread.
+
+@replica_reads
+async def home_async(request):
+    # rendering is blocking work: in a thread, like the other async views
+    return await sync_to_async(render)(request, "homepage.html")
+
+
+@replica_reads
+async def p_event_async(request):
+    if request.account is None:
+        return redirect('login')
+
+    if request.account.role != 'participant':
+        messages.error(request, "Access denied")
+        return redirect('login')
+
+    page = request.GET.get('page', '')
+    page_number = int(page) if page.isdigit() and int(page) > 0 else 1
+    return HttpResponse(await arender_feed_page(page_number))
+
+
+@replica_reads
+@pin_primary
+async def organizer_async(request):
+    if request.account is None:
+        return redirect('login')
+
+    if request.account.role != 'organizer':
+        messages.error(request, "Access denied")
+        return redirect('login')
+
+    if request.method == "POST":
+        participation_ids = [
+            pk for pk in request.POST.getlist("participation_id") if pk.isdigit()
+        ]
+        if not participation_ids:
+            messages.error(request, "No submission selected")
+            return redirect('organizer')
+
+        # one transaction, which the async ORM can't open; run it in a thread
+        selected, taken, unavailable = await sync_to_async(select_participations)(
+            participation_ids, request.account.id
+        )
+
+        for participation in selected:
+            messages.success(request, f"'{participation.idea_title}' selected successfully!")
+        if taken:
+            messages.warning(
+                request,
+                "Already selected by another organizer: "
+                + ", ".join(f"#{pk}" for pk in taken),
+            )
+        for participation in unavailable:
+            messages.error(
+                request,
+                f"'{participation.idea_title}' not selected: {participation.venue} is already "
+                f"booked on {participation.preferred_date}.",
+            )
+        return redirect('organizer')
+
+    queue = (
+        Participation.objects
+        .filter(selected_event__isnull=True)
+        .only(*QUEUE_COLUMNS)
+        .order_by('-id')
+    )
+    # ?category=&location=&catering=&budget=: narrow the queue; counts come from FacetCount
+    filters = active_filters(request.GET)
+    queue = filter_queue(queue, filters)
+
+    query = request.GET.get('q', '').strip()
+    if query:
+        # raw FTS query: no async cursor API, so it runs in a thread
+        ids = await sync_to_async(ranked_ids)(query, limit=QUEUE_PAGE_SIZE, queryset=queue)
+        by_id = await queue.ain_bulk(ids)
+        return await sync_to_async(render)(request, "organizer.html", {
+            'participations': [by_id[pk] for pk in ids if pk in by_id],
+            'query': query,
+            'is_first_page': True,
+            'facets': await afacet_counts(filters),
+            'filters': filters,
+        })
+
+    before = request.GET.get('before', '')
+    if before.isdigit():
+        queue = queue.filter(id__lt=int(before))
+
+    participations = [p async for p in queue[:QUEUE_PAGE_SIZE + 1]]
+    next_cursor = None
+    if len(participations) > QUEUE_PAGE_SIZE:
+        participations = participations[:QUEUE_PAGE_SIZE]
+        next_cursor = participations[-1].id
+
+    return await sync_to_async(render)(request, "organizer.html", {
+        'participations': participations,
+        'next_cursor': next_cursor,
+        'is_first_page': not before.isdigit(),
+        'facets': await afacet_counts(filters),
+        'filters': filters,
+        'filter_query': urlencode(filters),
+    })
+
+
+@rate_limited('participate')
+@pin_primary
+async def participate_async(request):
+    await venue_catalog.arefresh()  # the form reads venue choices from it
+    if request.method == "POST":
+        # multipart parsing writes the upload to disk: in a thread
+        form = await sync_to_async(_bound_participation_form)(request)
+        if await form.ais_valid():
+            if settings.SUBMISSION_WRITE_BEHIND:
+                # file writes and fsync: in a thread
+                receipt = await sync_to_async(journal_submission)(form)
+                messages.success(request, f"Submission received. Your receipt: {receipt}")
+                return redirect('participate')
+            participation = await form.asave()
+            await sync_to_async(count_added)([participation])
+            messages.success(request, "Submission successful")
+            return redirect('p_event')
+    else:
+        form = ParticipationForm()
+
+    # template rendering is CPU-bound and would stall the event loop
+    return await sync_to_async(render)(request, "participate.html", {'form': form})
+
+
+# pages with an async version; urls.py serves these with ASYNC_VIEWS on
+ASYNC_VERSIONS = {
+    home: home_async,
+    p_event: p_event_async,
+    organizer: organizer_async,
+    participate: participate_async,
+}